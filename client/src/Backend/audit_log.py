@@ -0,0 +1,260 @@
+# audit_log.py
+"""
+Non-blocking prediction audit log.
+
+AuditLogWriter buffers records in a bounded in-memory queue; a background thread drains
+them in batches and appends each batch as one gzip member to the current segment file
+(audit-<timestamp>-<pid>-<seq>.jsonl.gz), fsyncing after every batch. Segments rotate
+once they exceed max_segment_bytes. Because every batch is a complete gzip member, a crash
+can at worst leave one truncated member at the end of the last segment; the reader skips it.
+
+Backpressure: submit() never blocks - it is called from async request handlers on the
+event-loop thread - so when the buffer is full the record is dropped and counted in stats().
+
+Usage (CLI):
+    python audit_log.py cat audit_logs/audit-20250101T000000-123-00001.jsonl.gz
+    python audit_log.py replay audit_logs/audit-20250101T000000-123-00001.jsonl.gz [model.pkl]
+"""
+
+from pathlib import Path
+import os
+import sys
+import gzip
+import json
+import time
+import zlib
+import queue
+import atexit
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, Iterator, List
+
+import numpy as np
+
+from worker_queue import QueueWorkerStats
+
+logger = logging.getLogger("audit_log")
+logger.setLevel(logging.INFO)
+
+SEGMENT_GLOB = "audit-*.jsonl.gz"
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    return str(obj)
+
+
+class AuditLogWriter(QueueWorkerStats):
+    """Background, batched, size-rotated writer of JSON-lines audit records."""
+
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 1024 * 1024,
+                 batch_size: int = 256, flush_interval: float = 1.0, linger: float = 0.05,
+                 max_queue: int = 10_000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_segment_bytes = max_segment_bytes
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.linger = linger
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._segment_seq = 0
+        self._segment: Optional[Path] = None
+        self._fh = None
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+        self.segments = 0
+        self._closed = False
+        self._worker = threading.Thread(target=self._run, name="audit-log", daemon=True)
+        self._worker.start()
+        atexit.register(self.close)
+
+    # ------------------ Producer side ------------------
+    def submit(self, record: Dict[str, Any]) -> bool:
+        """Queue a record without blocking; drops it (and counts the drop) when the buffer is full."""
+        if self._closed:
+            return False
+        try:
+            self._queue.put_nowait(record)
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    # ------------------ Writer thread ------------------
+    def _run(self):
+        stop = False
+        while not stop:
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            batch: List[Dict[str, Any]] = []
+            if first is None:
+                stop = True
+            else:
+                batch.append(first)
+            # wait up to `linger` for more records so light traffic still gets batched
+            deadline = time.monotonic() + self.linger
+            while len(batch) < self.batch_size and not stop:
+                try:
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            if batch:
+                try:
+                    self._write_batch(batch)
+                except Exception as e:
+                    logger.error("Audit batch of %d records lost: %s", len(batch), e)
+                    with self._lock:
+                        self.dropped += len(batch)
+        self._close_segment()
+
+    def _open_segment(self):
+        self._segment_seq += 1
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S")
+        self._segment = self.directory / f"audit-{stamp}-{os.getpid()}-{self._segment_seq:05d}.jsonl.gz"
+        self._fh = open(self._segment, "ab")
+        self.segments += 1
+
+    def _close_segment(self):
+        if self._fh is not None:
+            self._fh.close()
+            self._fh = None
+
+    def _write_batch(self, batch: List[Dict[str, Any]]):
+        if self._fh is None or self._fh.tell() >= self.max_segment_bytes:
+            self._close_segment()
+            self._open_segment()
+        payload = "".join(json.dumps(r, default=_json_default) + "\n" for r in batch).encode("utf-8")
+        self._fh.write(gzip.compress(payload, compresslevel=6))
+        self._fh.flush()
+        os.fsync(self._fh.fileno())
+        with self._lock:
+            self.written += len(batch)
+            self.batches += 1
+
+    # ------------------ Lifecycle ------------------
+    def close(self, timeout: float = 5.0):
+        """Flush everything still buffered and close the current segment."""
+        if self._closed:
+            return
+        self._closed = True
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            logger.warning("Audit queue still full at shutdown; some records may be lost")
+        self._worker.join(timeout=timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "directory": str(self.directory),
+                "current_segment": self._segment.name if self._segment else None,
+                "written": self.written,
+                "dropped": self.dropped,
+                "batches": self.batches,
+                "segments": self.segments,
+                "queue_depth": self._queue.qsize(),
+            }
+
+
+# ------------------ Reader ------------------
+def iter_segment(path: str) -> Iterator[Dict[str, Any]]:
+    """Yield records from a segment; a truncated or corrupt trailing member ends iteration."""
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as fh:
+            for line in fh:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning("Partial record at the end of %s ignored", path)
+                    return
+    except (EOFError, OSError, zlib.error) as e:
+        logger.warning("Truncated or corrupt tail in %s: %s", path, e)
+
+
+def list_segments(directory: str) -> List[Path]:
+    return sorted(Path(directory).glob(SEGMENT_GLOB))
+
+
+def replay_segment(path: str, model_path: Optional[str] = None, chunk_size: int = 1000,
+                   max_mismatches: int = 20) -> Dict[str, Any]:
+    """
+    Re-score the recorded feature rows of a segment with the current model and compare
+    against the recorded prediction_class. Rows are scored in batches, not one by one.
+    """
+    import pandas as pd
+    from predict_single import DEFAULT_MODEL_PATH, safe_load_model
+
+    model_path = Path(model_path) if model_path else DEFAULT_MODEL_PATH
+    model_obj, _ = safe_load_model(model_path)
+
+    report = {"segment": str(path), "model_path": str(model_path), "records": 0, "replayed": 0,
+              "matches": 0, "mismatches": 0, "skipped": 0, "mismatch_examples": []}
+    started = time.perf_counter()
+
+    def score(records: List[Dict[str, Any]]):
+        frame = pd.DataFrame([r["features"] for r in records])
+        preds = model_obj.predict(frame)
+        for rec, pred in zip(records, preds):
+            report["replayed"] += 1
+            pred = pred.item() if isinstance(pred, np.generic) else pred
+            if str(pred) == str(rec.get("prediction_class")):
+                report["matches"] += 1
+            else:
+                report["mismatches"] += 1
+                if len(report["mismatch_examples"]) < max_mismatches:
+                    report["mismatch_examples"].append({
+                        "ts": rec.get("ts"), "query": rec.get("query"),
+                        "recorded": rec.get("prediction_class"), "replayed": pred,
+                        "recorded_model": rec.get("model_version"),
+                    })
+
+    pending: List[Dict[str, Any]] = []
+    for rec in iter_segment(path):
+        report["records"] += 1
+        if not rec.get("features") or rec.get("prediction_class") is None:
+            report["skipped"] += 1
+            continue
+        pending.append(rec)
+        if len(pending) >= chunk_size:
+            score(pending)
+            pending = []
+    if pending:
+        score(pending)
+
+    report["match_rate"] = round(report["matches"] / report["replayed"], 4) if report["replayed"] else None
+    report["seconds"] = round(time.perf_counter() - started, 3)
+    return report
+
+
+# CLI runner
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 3 or sys.argv[1] not in ("cat", "replay"):
+        print("Usage:\n  python audit_log.py cat <segment.jsonl.gz>\n"
+              "  python audit_log.py replay <segment.jsonl.gz> [model.pkl]")
+        sys.exit(1)
+    if sys.argv[1] == "cat":
+        for rec in iter_segment(sys.argv[2]):
+            print(json.dumps(rec))
+        return
+    model_path = sys.argv[3] if len(sys.argv) >= 4 else None
+    print(json.dumps(replay_segment(sys.argv[2], model_path), indent=2, default=_json_default))
+
+
+if __name__ == "__main__":
+    main()
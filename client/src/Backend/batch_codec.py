@@ -0,0 +1,135 @@
+# batch_codec.py
+"""
+Binary columnar payloads for high-volume batch scoring (POST /predict/batch).
+
+Request body: a NumPy .npz archive in one of two layouts
+    1. one array per column, named exactly like the model feature (column manifest = array names).
+       String columns may be sent either as a fixed-width unicode array, or as integer codes
+       plus a "<column>__categories" array (fastest: no string handling at all).
+    2. a 2-D numeric matrix "X" plus a "columns" unicode array naming its columns.
+
+Response body: a .npy float32 array of shape (n_rows, n_classes) with class probabilities.
+
+Decoding never builds per-row Python objects: numeric columns are wrapped as-is and
+string columns become pandas Categoricals via vectorized np.unique / from_codes.
+
+Client example:
+    payload = encode_columnar(df[feature_order])
+    requests.post(url, data=payload, headers={"Content-Type": "application/octet-stream"})
+    proba = decode_array(resp.content)
+"""
+
+import io
+from typing import Optional, Dict, List, Mapping, Union
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES_SUFFIX = "__categories"
+MAX_ROWS = 1_000_000
+# default request body cap; enforced by the server before the payload is decoded
+MAX_PAYLOAD_BYTES = 256 * 1024 * 1024
+
+
+def _as_column(values: np.ndarray, categories: Optional[np.ndarray]) -> object:
+    if values.ndim != 1:
+        raise ValueError(f"column arrays must be 1-D, got shape {values.shape}")
+    if categories is not None:
+        if values.dtype.kind not in "iu":
+            raise ValueError("categorical codes must be an integer array")
+        return pd.Categorical.from_codes(values.astype(np.int32, copy=False), categories=categories)
+    if values.dtype.kind in "US":
+        uniques, codes = np.unique(values, return_inverse=True)
+        return pd.Categorical.from_codes(codes.astype(np.int32, copy=False), categories=uniques.astype(str))
+    if values.dtype.kind not in "biuf":
+        raise ValueError(f"unsupported column dtype {values.dtype}")
+    return values
+
+
+def _member_rows(archive, name: str) -> int:
+    """Leading dimension of an archive member, read from its .npy header only."""
+    try:
+        with archive.zip.open(name + ".npy") as fh:
+            version = np.lib.format.read_magic(fh)
+            read_header = (np.lib.format.read_array_header_1_0 if version == (1, 0)
+                           else np.lib.format.read_array_header_2_0)
+            shape, _, _ = read_header(fh)
+    except Exception as e:
+        raise ValueError(f"member {name!r} is not a valid .npy array: {e}")
+    return int(shape[0]) if shape else 1
+
+
+def decode_columnar(payload: bytes, feature_order: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Decode an .npz columnar payload into a DataFrame ordered by feature_order.
+    Raises ValueError for malformed payloads or a column manifest that does not match.
+    """
+    try:
+        archive = np.load(io.BytesIO(payload), allow_pickle=False)
+    except Exception as e:
+        raise ValueError(f"payload is not a valid .npz archive: {e}")
+
+    with archive:
+        files = set(archive.files)
+        # reject oversized batches from the .npy headers, before any (compressed) member is read
+        for name in files:
+            rows = _member_rows(archive, name)
+            if rows > MAX_ROWS:
+                raise ValueError(f"batch of {rows} rows exceeds the limit of {MAX_ROWS}")
+        columns: Dict[str, object] = {}
+        if "X" in files and "columns" in files:
+            matrix = archive["X"]
+            names = [str(c) for c in archive["columns"]]
+            if matrix.ndim != 2 or matrix.shape[1] != len(names):
+                raise ValueError(f"X has shape {matrix.shape} but {len(names)} columns were declared")
+            for j, name in enumerate(names):
+                columns[name] = _as_column(matrix[:, j], None)
+        else:
+            for name in files:
+                if name.endswith(CATEGORIES_SUFFIX):
+                    continue
+                cats_key = name + CATEGORIES_SUFFIX
+                cats = archive[cats_key].astype(str) if cats_key in files else None
+                columns[name] = _as_column(archive[name], cats)
+
+    if not columns:
+        raise ValueError("payload contains no columns")
+    lengths = {len(v) for v in columns.values()}
+    if len(lengths) != 1:
+        raise ValueError(f"columns have different lengths: {sorted(lengths)}")
+    n_rows = lengths.pop()
+    if n_rows > MAX_ROWS:
+        raise ValueError(f"batch of {n_rows} rows exceeds the limit of {MAX_ROWS}")
+
+    order = list(feature_order) if feature_order else sorted(columns)
+    missing = [c for c in order if c not in columns]
+    extra = [c for c in columns if c not in order]
+    if missing or extra:
+        raise ValueError(f"column manifest mismatch: missing={missing} unexpected={extra}")
+    return pd.DataFrame({c: columns[c] for c in order}, columns=order, copy=False)
+
+
+def encode_columnar(frame: Union[pd.DataFrame, Mapping[str, np.ndarray]]) -> bytes:
+    """Encode a DataFrame (or dict of arrays) as a columnar .npz payload."""
+    arrays: Dict[str, np.ndarray] = {}
+    for name in frame.keys():
+        col = frame[name]
+        if isinstance(col, pd.Series) and not pd.api.types.is_numeric_dtype(col.dtype):
+            cat = pd.Categorical(col.astype(str))
+            arrays[name] = cat.codes.astype(np.int32)
+            arrays[name + CATEGORIES_SUFFIX] = np.asarray(cat.categories, dtype=str)
+        else:
+            arrays[name] = np.asarray(col)
+    buf = io.BytesIO()
+    np.savez(buf, **arrays)
+    return buf.getvalue()
+
+
+def encode_array(arr: np.ndarray) -> bytes:
+    buf = io.BytesIO()
+    np.save(buf, np.ascontiguousarray(arr), allow_pickle=False)
+    return buf.getvalue()
+
+
+def decode_array(payload: bytes) -> np.ndarray:
+    return np.load(io.BytesIO(payload), allow_pickle=False)
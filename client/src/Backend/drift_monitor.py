@@ -0,0 +1,424 @@
+# drift_monitor.py
+"""
+Constant-memory streaming feature drift monitor.
+
+Every scored feature row updates one sketch per column:
+    - numeric columns: a KLL-style mergeable quantile sketch (compactor levels, about 3*k items)
+    - categorical columns (Species_Name, Region, ...): a Misra-Gries heavy-hitter counter
+
+Sketches serialize to plain JSON, so a reference sketch can be written at training time
+and live sketches from several workers can be merged. Drift scores compare live vs
+reference: Kolmogorov-Smirnov distance for numeric columns, total variation distance over
+the tracked heavy hitters (plus an "other" bucket) for categoricals.
+
+The live monitor should take its columns and sketch types from the reference
+(from_reference), so a numeric training column is never tracked as categorical just
+because the service happened to fill it with a placeholder. Reference columns that no
+live row ever populated are reported as "not populated" rather than scored. Live columns
+the reference lacks are still tracked (typed by their first value) and reported as
+"no reference", so a reference built for another schema never hides served features.
+
+The reference /predict is scored against must cover the served feature rows
+(Species_Name, Region, Latitude, ... as built by build_feature_row), not the occurrence
+columns of train_model.py artifacts: build it with the "reference" subcommand from a CSV
+of served feature rows, or of queries (query[, latitude, longitude]) that are turned into
+feature rows the way predict_single does.
+
+Usage:
+    monitor = FeatureDriftMonitor.from_reference(reference_monitor)
+    monitor.update_row({"decimalLatitude": 13.2, "waterBody": "Bay of Bengal"})
+    monitor.drift_scores(reference_monitor)
+
+Usage (CLI):
+    python drift_monitor.py merge worker1.json worker2.json [--reference model.drift.json]
+    python drift_monitor.py reference stock_features.csv models/oceanai_model_v1.drift.json
+    python drift_monitor.py reference queries.csv models/oceanai_model_v1.drift.json --queries
+"""
+
+from pathlib import Path
+import sys
+import json
+import random
+import argparse
+import threading
+import logging
+from typing import Optional, Dict, Any, List, Iterable
+
+import numpy as np
+
+logger = logging.getLogger("drift_monitor")
+logger.setLevel(logging.INFO)
+
+DEFAULT_K = 200
+DEFAULT_HEAVY_HITTERS = 64
+
+
+class QuantileSketch:
+    """
+    KLL-style quantile sketch. Level h holds items of weight 2**h; when a level exceeds its
+    capacity it is sorted and every other item (random offset) is promoted to level h + 1.
+    """
+
+    def __init__(self, k: int = DEFAULT_K, seed: Optional[int] = None):
+        self.k = k
+        self.levels: List[List[float]] = [[]]
+        self.n = 0
+        self.min = float("inf")
+        self.max = float("-inf")
+        self._rng = random.Random(seed)
+
+    def _capacity(self, level: int) -> int:
+        depth = len(self.levels) - level - 1
+        return max(2, int(self.k * (2 / 3) ** depth))
+
+    def update(self, value: float):
+        if value != value:  # NaN
+            return
+        self.levels[0].append(value)
+        self.n += 1
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        if len(self.levels[0]) >= self._capacity(0):
+            self._compress()
+
+    def _compress(self):
+        """Compact every over-capacity level, lowest first (promotions can cascade upwards)."""
+        h = 0
+        while h < len(self.levels):
+            if len(self.levels[h]) >= self._capacity(h):
+                if h + 1 == len(self.levels):
+                    self.levels.append([])
+                items = sorted(self.levels[h])
+                offset = self._rng.randint(0, 1)
+                # an odd leftover stays on this level so total weight is preserved
+                self.levels[h] = [items.pop()] if len(items) % 2 else []
+                self.levels[h + 1].extend(items[offset::2])
+            h += 1
+
+    def merge(self, other: "QuantileSketch"):
+        while len(self.levels) < len(other.levels):
+            self.levels.append([])
+        for h, items in enumerate(other.levels):
+            self.levels[h].extend(items)
+        self.n += other.n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+
+    def _weighted(self):
+        values = np.concatenate([np.asarray(items, dtype=np.float64) for items in self.levels])
+        weights = np.concatenate([np.full(len(items), 2 ** h, dtype=np.float64)
+                                  for h, items in enumerate(self.levels)])
+        order = np.argsort(values, kind="mergesort")
+        return values[order], weights[order]
+
+    def cdf(self, points: np.ndarray) -> np.ndarray:
+        """Estimated fraction of observed values <= each point."""
+        values, weights = self._weighted()
+        if len(values) == 0:
+            return np.zeros(len(points))
+        cum = np.cumsum(weights)
+        idx = np.searchsorted(values, points, side="right")
+        return np.where(idx > 0, cum[np.maximum(idx - 1, 0)], 0.0) / cum[-1]
+
+    def quantile(self, q: float) -> Optional[float]:
+        values, weights = self._weighted()
+        if len(values) == 0:
+            return None
+        cum = np.cumsum(weights) / weights.sum()
+        return float(values[min(int(np.searchsorted(cum, q)), len(values) - 1)])
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "quantile", "k": self.k, "n": self.n, "min": self.min, "max": self.max,
+                "levels": [list(map(float, items)) for items in self.levels]}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "QuantileSketch":
+        sketch = cls(k=int(data.get("k", DEFAULT_K)))
+        sketch.levels = [list(items) for items in data.get("levels", [[]])] or [[]]
+        sketch.n = int(data.get("n", 0))
+        sketch.min = float(data.get("min", float("inf")))
+        sketch.max = float(data.get("max", float("-inf")))
+        return sketch
+
+
+class HeavyHitters:
+    """Misra-Gries frequent-items summary with at most `capacity` counters."""
+
+    def __init__(self, capacity: int = DEFAULT_HEAVY_HITTERS):
+        self.capacity = capacity
+        self.counters: Dict[str, int] = {}
+        self.n = 0
+
+    def update(self, value: Any, count: int = 1):
+        key = str(value)
+        self.n += count
+        if key in self.counters:
+            self.counters[key] += count
+        elif len(self.counters) < self.capacity:
+            self.counters[key] = count
+        else:
+            self._decrement(count)
+
+    def _decrement(self, amount: int):
+        dec = min(amount, min(self.counters.values()))
+        self.counters = {k: c - dec for k, c in self.counters.items() if c > dec}
+
+    def merge(self, other: "HeavyHitters"):
+        for key, count in other.counters.items():
+            self.counters[key] = self.counters.get(key, 0) + count
+        self.n += other.n
+        if len(self.counters) > self.capacity:
+            # keep the top `capacity` counters, subtracting the (capacity+1)-th count from all
+            ranked = sorted(self.counters.values(), reverse=True)
+            cut = ranked[self.capacity]
+            self.counters = {k: c - cut for k, c in self.counters.items() if c > cut}
+
+    def frequencies(self) -> Dict[str, float]:
+        return {k: c / self.n for k, c in self.counters.items()} if self.n else {}
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"type": "heavy_hitters", "capacity": self.capacity, "n": self.n,
+                "counters": dict(self.counters)}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HeavyHitters":
+        sketch = cls(capacity=int(data.get("capacity", DEFAULT_HEAVY_HITTERS)))
+        sketch.counters = {str(k): int(v) for k, v in data.get("counters", {}).items()}
+        sketch.n = int(data.get("n", 0))
+        return sketch
+
+
+def ks_distance(live: QuantileSketch, reference: QuantileSketch) -> Optional[float]:
+    if live.n == 0 or reference.n == 0:
+        return None
+    points = np.union1d(live._weighted()[0], reference._weighted()[0])
+    return float(np.max(np.abs(live.cdf(points) - reference.cdf(points))))
+
+
+def tv_distance(live: HeavyHitters, reference: HeavyHitters) -> Optional[float]:
+    if live.n == 0 or reference.n == 0:
+        return None
+    p, q = live.frequencies(), reference.frequencies()
+    keys = set(p) | set(q)
+    diff = sum(abs(p.get(k, 0.0) - q.get(k, 0.0)) for k in keys)
+    # untracked ("other") mass on each side
+    diff += abs((1 - sum(p.values())) - (1 - sum(q.values())))
+    return float(diff / 2)
+
+
+class FeatureDriftMonitor:
+    """One sketch per feature column; thread-safe updates, JSON round-trip and merge."""
+
+    def __init__(self, numeric: Iterable[str] = (), categorical: Iterable[str] = (),
+                 k: int = DEFAULT_K, heavy_hitters: int = DEFAULT_HEAVY_HITTERS):
+        self.k = k
+        self.heavy_hitters = heavy_hitters
+        self.sketches: Dict[str, Any] = {}
+        for col in numeric:
+            self.sketches[col] = QuantileSketch(k)
+        for col in categorical:
+            self.sketches[col] = HeavyHitters(heavy_hitters)
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_frame_schema(cls, frame, **kwargs) -> "FeatureDriftMonitor":
+        """Numeric dtypes get quantile sketches, everything else heavy-hitter counters."""
+        numeric, categorical = [], []
+        for col, dtype in frame.dtypes.items():
+            (numeric if dtype.kind in "biuf" else categorical).append(col)
+        return cls(numeric, categorical, **kwargs)
+
+    @classmethod
+    def from_reference(cls, reference: "FeatureDriftMonitor") -> "FeatureDriftMonitor":
+        """Empty monitor with the reference's columns, sketch types and sizes."""
+        monitor = cls()
+        for col, sketch in reference.sketches.items():
+            if isinstance(sketch, QuantileSketch):
+                monitor.sketches[col] = QuantileSketch(sketch.k)
+            else:
+                monitor.sketches[col] = HeavyHitters(sketch.capacity)
+        return monitor
+
+    def _track(self, col: str, value: Any):
+        """Start tracking a column seen for the first time; the value decides the sketch type."""
+        numeric = isinstance(value, (int, float, np.number)) and not isinstance(value, (bool, np.bool_))
+        self.sketches[col] = QuantileSketch(self.k) if numeric else HeavyHitters(self.heavy_hitters)
+
+    def update_row(self, row: Dict[str, Any]):
+        with self._lock:
+            self.rows += 1
+            for col, value in row.items():
+                if col not in self.sketches:
+                    self._track(col, value)
+            for col, sketch in self.sketches.items():
+                if col not in row:
+                    continue
+                value = row[col]
+                if isinstance(sketch, QuantileSketch):
+                    try:
+                        sketch.update(float(value))
+                    except (TypeError, ValueError):
+                        continue
+                else:
+                    sketch.update(value)
+
+    def update_frame(self, frame):
+        """Update from every row of a DataFrame (column-wise, for training-time references)."""
+        with self._lock:
+            self.rows += len(frame)
+            for col, sketch in self.sketches.items():
+                if col not in frame:
+                    continue
+                if isinstance(sketch, QuantileSketch):
+                    for value in np.asarray(frame[col], dtype=np.float64):
+                        sketch.update(float(value))
+                else:
+                    # missing values and "" placeholders are not observations
+                    values = frame[col].dropna().astype(str)
+                    for value, count in values[values != ""].value_counts().items():
+                        sketch.update(value, int(count))
+
+    def merge(self, other: "FeatureDriftMonitor"):
+        with self._lock:
+            self.rows += other.rows
+            for col, sketch in other.sketches.items():
+                if col in self.sketches:
+                    self.sketches[col].merge(sketch)
+                else:
+                    self.sketches[col] = sketch
+
+    def drift_scores(self, reference: "FeatureDriftMonitor") -> Dict[str, Any]:
+        """
+        Per-feature drift vs reference (0 = identical, 1 = disjoint). Every reference column
+        is listed; status is "ok", "not populated" (no live values yet), "no reference"
+        (live-only column) or "type mismatch".
+        """
+        scores: Dict[str, Any] = {}
+        with self._lock:
+            for col in list(reference.sketches) + [c for c in self.sketches if c not in reference.sketches]:
+                live, ref = self.sketches.get(col), reference.sketches.get(col)
+                n = getattr(live, "n", 0) if live is not None else 0
+                if ref is None:
+                    scores[col] = {"status": "no reference", "metric": None, "score": None, "n": n,
+                                   **self._live_summary(live)}
+                elif n == 0:
+                    scores[col] = {"status": "not populated", "metric": None, "score": None, "n": 0}
+                elif isinstance(live, QuantileSketch) and isinstance(ref, QuantileSketch):
+                    scores[col] = {"status": "ok", "metric": "ks", "score": ks_distance(live, ref), "n": n,
+                                   "live_median": live.quantile(0.5), "reference_median": ref.quantile(0.5)}
+                elif isinstance(live, HeavyHitters) and isinstance(ref, HeavyHitters):
+                    scores[col] = {"status": "ok", "metric": "tv", "score": tv_distance(live, ref), "n": n,
+                                   **self._live_summary(live)}
+                else:
+                    scores[col] = {"status": "type mismatch", "metric": None, "score": None, "n": n}
+        return scores
+
+    @staticmethod
+    def _live_summary(sketch) -> Dict[str, Any]:
+        if sketch is None or sketch.n == 0:
+            return {}
+        if isinstance(sketch, QuantileSketch):
+            return {"live_median": sketch.quantile(0.5)}
+        top = sorted(sketch.counters.items(), key=lambda kv: -kv[1])[:5]
+        return {"live_top": [k for k, _ in top]}
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"rows": self.rows, "sketches": {c: s.to_dict() for c, s in self.sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "FeatureDriftMonitor":
+        monitor = cls()
+        monitor.rows = int(data.get("rows", 0))
+        for col, sketch in data.get("sketches", {}).items():
+            if sketch.get("type") == "quantile":
+                monitor.sketches[col] = QuantileSketch.from_dict(sketch)
+            else:
+                monitor.sketches[col] = HeavyHitters.from_dict(sketch)
+        return monitor
+
+    def save(self, path: str) -> Path:
+        path = Path(path)
+        path.write_text(json.dumps(self.to_dict()))
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "FeatureDriftMonitor":
+        return cls.from_dict(json.loads(Path(path).read_text()))
+
+
+def build_reference(frame, **kwargs) -> FeatureDriftMonitor:
+    """Reference sketch over every column of a DataFrame, typed by its dtypes."""
+    monitor = FeatureDriftMonitor.from_frame_schema(frame, **kwargs)
+    monitor.update_frame(frame)
+    return monitor
+
+
+def served_feature_rows(queries) -> "pandas.DataFrame":
+    """
+    Feature rows /predict would score for a frame of queries (query[, latitude, longitude]),
+    built with predict_single's parser and feature builder.
+    """
+    import pandas as pd
+    from predict_single import parse_query_for_species_region, build_feature_dataframe, get_marine_regions
+
+    frames = []
+    for rec in queries.to_dict("records"):
+        species, region, match = parse_query_for_species_region(str(rec.get("query", "")))
+        lat, lon = rec.get("latitude"), rec.get("longitude")
+        lat = None if lat is None or lat != lat else float(lat)
+        lon = None if lon is None or lon != lon else float(lon)
+        if lat is not None and lon is not None:
+            info = get_marine_regions().lookup(lat, lon)
+            if info:
+                region = info["basin"]
+        frames.append(build_feature_dataframe(species, region, scientific_name=match.scientific_name if match else None,
+                                              latitude=lat, longitude=lon))
+    return pd.concat(frames, ignore_index=True)
+
+
+# CLI runner
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Merge drift sketches and score them against a reference")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_merge = sub.add_parser("merge", help="merge sketches exported by several workers (GET /drift/sketch)")
+    p_merge.add_argument("sketches", nargs="+")
+    p_merge.add_argument("--reference", default=None)
+    p_merge.add_argument("--output", default=None)
+    p_ref = sub.add_parser("reference", help="build a reference sketch for the served feature rows")
+    p_ref.add_argument("csv", help="served feature rows (Species_Name, Region, ...) or, with --queries, queries")
+    p_ref.add_argument("output")
+    p_ref.add_argument("--queries", action="store_true",
+                       help="csv has query[, latitude, longitude] columns; build feature rows from them")
+    args = parser.parse_args(argv)
+
+    if args.command == "reference":
+        import pandas as pd
+
+        frame = pd.read_csv(args.csv, low_memory=False)
+        if args.queries:
+            frame = served_feature_rows(frame)
+        reference = build_reference(frame)
+        reference.save(args.output)
+        print(json.dumps({"rows": reference.rows, "columns": {c: type(s).__name__ for c, s in
+                                                              reference.sketches.items()}}, indent=2))
+        return
+
+    merged = FeatureDriftMonitor()
+    for path in args.sketches:
+        data = json.loads(Path(path).read_text())
+        merged.merge(FeatureDriftMonitor.from_dict(data.get("monitor", data)))
+    if args.output:
+        merged.save(args.output)
+    out: Dict[str, Any] = {"rows": merged.rows}
+    if args.reference:
+        out["drift"] = merged.drift_scores(FeatureDriftMonitor.load(args.reference))
+    print(json.dumps(out, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -1,16 +1,29 @@
 # main.py (patched)
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from starlette.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
 import logging
+import os
 import random
+import time
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import Optional
+from typing import Optional, List, Annotated
 import json
+from datetime import datetime, timezone
 
 from validate_model import ModelValidator
+from species_resolver import PREDICTION_RANKS, load_resolver
+from batch_codec import MAX_PAYLOAD_BYTES, decode_columnar, encode_array
+from shadow_eval import ShadowEvaluator, limit_threads
+from drift_monitor import FeatureDriftMonitor
+from audit_log import AuditLogWriter
+from marine_regions import MarineRegionIndex
+from telemetry import ProcessTelemetry, anyio_threadpool_probe
+from region_summary import (RegionSummarizer, load_region_species, stock_status,
+                            summarize_probabilities, summarize_statuses)
 
 # ------------------ Logging ------------------
 logging.basicConfig(level=logging.INFO)
@@ -35,13 +48,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# requests currently being handled; shadow scoring is skipped when this is high
+inflight_requests = 0
+
+@app.middleware("http")
+async def track_inflight(request: Request, call_next):
+    global inflight_requests
+    inflight_requests += 1
+    try:
+        return await call_next(request)
+    finally:
+        inflight_requests -= 1
+
 # ------------------ Model Loading ------------------
 MODEL_DIR = Path(__file__).parent / "models"
 PRIMARY_MODEL = MODEL_DIR / "oceanai_model_v1.pkl"
 FALLBACK_MODEL = MODEL_DIR / "oceanai_pipeline.pkl"
+SPECIES_INDEX = MODEL_DIR / "species_index.npz"
 
 model = None
 model_loaded = False
+model_path: Optional[Path] = None
 model_feature_order: Optional[list] = None
 
 def try_load(path: Path):
@@ -57,6 +84,7 @@ if PRIMARY_MODEL.exists():
     try:
         model, model_feature_order = try_load(PRIMARY_MODEL)
         model_loaded = True
+        model_path = PRIMARY_MODEL
         logger.info("Loaded primary model: %s", PRIMARY_MODEL)
     except Exception:
         model = None
@@ -66,6 +94,7 @@ if not model_loaded and FALLBACK_MODEL.exists():
     try:
         model, model_feature_order = try_load(FALLBACK_MODEL)
         model_loaded = True
+        model_path = FALLBACK_MODEL
         logger.info("Loaded fallback model: %s", FALLBACK_MODEL)
     except Exception:
         model = None
@@ -88,9 +117,141 @@ if model_loaded:
 else:
     logger.info("No model loaded; service will use fallback generator.")
 
+# ------------------ Shadow Model ------------------
+# Optional candidate scored next to the primary model, off the response path
+SHADOW_MODEL = os.environ.get("OCEANAI_SHADOW_MODEL")
+SHADOW_MAX_INFLIGHT = int(os.environ.get("OCEANAI_SHADOW_MAX_INFLIGHT", "8"))
+shadow: Optional[ShadowEvaluator] = None
+
+if SHADOW_MODEL:
+    try:
+        shadow_model, _ = try_load(Path(SHADOW_MODEL))
+        # single-threaded so shadow scoring does not compete with the primary for cores
+        limit_threads(shadow_model)
+        shadow = ShadowEvaluator(shadow_model, version=Path(SHADOW_MODEL).name)
+        logger.info("Shadow model enabled: %s", SHADOW_MODEL)
+    except Exception:
+        shadow = None
+
+# ------------------ Drift Monitor ------------------
+# Live sketches of every scored feature row, compared with a reference of the served
+# feature rows stored next to the model (drift_monitor.py reference ...; override with
+# OCEANAI_DRIFT_REFERENCE). Columns missing from the reference are still tracked.
+DRIFT_REFERENCE = os.environ.get("OCEANAI_DRIFT_REFERENCE") or (
+    str(model_path.with_suffix(".drift.json")) if model_path else None
+)
+drift_reference: Optional[FeatureDriftMonitor] = None
+drift_monitor: Optional[FeatureDriftMonitor] = None
+
+if DRIFT_REFERENCE and Path(DRIFT_REFERENCE).exists():
+    try:
+        drift_reference = FeatureDriftMonitor.load(DRIFT_REFERENCE)
+        logger.info("Loaded drift reference: %s", DRIFT_REFERENCE)
+    except Exception as e:
+        logger.warning("Drift reference load failed for %s: %s", DRIFT_REFERENCE, e)
+
+def record_drift(feature_row: dict, feature_df: pd.DataFrame):
+    global drift_monitor
+    try:
+        # columns build_feature_row could not fill are "" placeholders, not observations
+        populated = {k: v for k, v in feature_row.items() if not (isinstance(v, str) and v == "")}
+        if drift_monitor is None:
+            # sketch types follow the training reference; schema inference is the fallback
+            drift_monitor = (FeatureDriftMonitor.from_reference(drift_reference) if drift_reference is not None
+                             else FeatureDriftMonitor.from_frame_schema(feature_df[list(populated)]))
+        drift_monitor.update_row(populated)
+    except Exception as e:
+        logger.warning("Drift monitor update failed: %s", e)
+
+# ------------------ Audit Log ------------------
+# Every /predict result is buffered and written in compressed batches off the request path
+AUDIT_DIR = Path(os.environ.get("OCEANAI_AUDIT_DIR", str(Path(__file__).parent / "audit_logs")))
+AUDIT_ENABLED = os.environ.get("OCEANAI_AUDIT_ENABLED", "1") != "0"
+model_version = model_path.name if model_path else "fallback"
+audit_log: Optional[AuditLogWriter] = None
+
+if AUDIT_ENABLED:
+    try:
+        audit_log = AuditLogWriter(str(AUDIT_DIR))
+        logger.info("Audit log writing to %s", AUDIT_DIR)
+    except Exception as e:
+        logger.warning("Audit log disabled (%s): %s", AUDIT_DIR, e)
+
+def record_audit(result: dict, feature_row: dict, started: float):
+    if audit_log is None:
+        return
+    audit_log.submit({
+        "ts": datetime.now(timezone.utc).isoformat(),
+        "query": result.get("query"),
+        "parsed": {
+            "species": result.get("species"),
+            "scientificName": result.get("Scientific_Name"),
+            "region": result.get("region"),
+            "regionCanonical": result.get("regionCanonical"),
+        },
+        "model_version": model_version,
+        "source": result.get("source"),
+        "prediction_class": result.get("prediction_class"),
+        "class_probabilities": result.get("class_probabilities"),
+        "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+        "features": feature_row,
+    })
+
+# ------------------ Region Summaries ------------------
+# Ranked per-species outlook for a whole region, cached per (region, model version)
+REGION_SUMMARY_CACHE_SIZE = int(os.environ.get("OCEANAI_REGION_SUMMARY_CACHE", "64"))
+region_summaries = RegionSummarizer(cache_size=REGION_SUMMARY_CACHE_SIZE)
+# most observed species per region key/basin (region_summary.py build); without it the
+# static OCEAN_POPULAR_FISHES lists are used
+REGION_SPECIES = os.environ.get("OCEANAI_REGION_SPECIES", str(MODEL_DIR / "region_species.json"))
+region_species_table = load_region_species(REGION_SPECIES)
+if region_species_table:
+    logger.info("Loaded species for %d regions from %s", len(region_species_table), REGION_SPECIES)
+
+# ------------------ Process Telemetry ------------------
+# RSS, GC pauses, model footprint and worker queues; OCEANAI_TRACEMALLOC=<frames> opts
+# into tracemalloc (slows allocation), OCEANAI_TELEMETRY_INTERVAL=0 turns the log line off
+TRACEMALLOC_FRAMES = int(os.environ.get("OCEANAI_TRACEMALLOC", "0"))
+TELEMETRY_INTERVAL = float(os.environ.get("OCEANAI_TELEMETRY_INTERVAL", "60"))
+telemetry = ProcessTelemetry(tracemalloc_frames=TRACEMALLOC_FRAMES)
+
+if model_loaded:
+    telemetry.register_model("primary", model, model_path)
+if shadow is not None:
+    telemetry.register_model("shadow", shadow.model, Path(SHADOW_MODEL))
+    telemetry.register_pool("shadow", shadow.utilization)
+if audit_log is not None:
+    telemetry.register_pool("audit_log", audit_log.utilization)
+telemetry.register_pool("http", lambda: {"inflight_requests": inflight_requests})
+
+@app.on_event("startup")
+async def start_telemetry():
+    # the anyio limiter can only be looked up on the event loop
+    telemetry.register_pool("threadpool", anyio_threadpool_probe())
+    telemetry.start_reporter(TELEMETRY_INTERVAL)
+
+@app.on_event("shutdown")
+def stop_background_workers():
+    if shadow is not None:
+        shadow.close()
+    if audit_log is not None:
+        audit_log.close()
+    telemetry.close()
+
 # ------------------ Schemas ------------------
+Latitude = Annotated[float, Field(ge=-90, le=90)]
+Longitude = Annotated[float, Field(ge=-180, le=180)]
+# points per /regions/classify request; larger batches should be split by the client
+CLASSIFY_MAX_POINTS = int(os.environ.get("OCEANAI_CLASSIFY_MAX_POINTS", "100000"))
+
 class PredictionInput(BaseModel):
     query: str
+    latitude: Optional[Latitude] = None
+    longitude: Optional[Longitude] = None
+
+class RegionClassifyInput(BaseModel):
+    latitudes: List[Latitude] = Field(max_length=CLASSIFY_MAX_POINTS)
+    longitudes: List[Longitude] = Field(max_length=CLASSIFY_MAX_POINTS)
 
 # ------------------ Utilities ------------------
 SPECIES_TO_SCIENTIFIC = {
@@ -103,6 +264,23 @@ SPECIES_TO_SCIENTIFIC = {
     "hilsa": "Tenualosa ilisha",
     "pomfret": "Pampus argenteus"
 }
+SCIENTIFIC_TO_SPECIES = {sci: common for common, sci in SPECIES_TO_SCIENTIFIC.items()}
+
+# fuzzy species/taxonomy lookup; falls back to the table above when no index file exists
+species_resolver = load_resolver(str(SPECIES_INDEX), seed=SPECIES_TO_SCIENTIFIC)
+
+
+def common_species_name(scientific_name: str) -> Optional[str]:
+    """Common name the model and fallback profiles know a scientific name by, if any."""
+    common = SCIENTIFIC_TO_SPECIES.get(scientific_name) or species_resolver.common_name(scientific_name)
+    return common.lower() if common else None
+
+# coordinates -> marine region (basins, seas, bays) from local polygons
+try:
+    marine_regions: Optional[MarineRegionIndex] = MarineRegionIndex.load()
+except Exception as e:
+    logger.warning("Marine region index unavailable: %s", e)
+    marine_regions = None
 
 # Popular fishes per region / canonical region names
 OCEAN_POPULAR_FISHES = {
@@ -158,13 +336,57 @@ def generate_intelligent_prediction(species: str, region: str):
     }
 
 
-def build_feature_dataframe(species: str, region: str) -> pd.DataFrame:
+def parse_region(query: str, latitude: Optional[float] = None, longitude: Optional[float] = None):
+    """(region, region_canonical, region_info) from query keywords, or from coordinates when given."""
+    region = next((r for r in ["pacific", "atlantic", "mediterranean", "north", "south", "indian"] if r in query), "pacific")
+
+    # try to infer a canonical region name if user typed a specific area
+    region_canonical = None
+    if "bay of bengal" in query or "bayofbengal" in query:
+        region_canonical = "bayofbengal"
+    elif "pacific" in query:
+        region_canonical = "pacific"
+    elif "atlantic" in query:
+        region_canonical = "atlantic"
+    elif "mediterranean" in query:
+        region_canonical = "mediterranean"
+    elif "indian" in query:
+        region_canonical = "indian"
+    else:
+        region_canonical = region
+
+    # a named sea/bay belongs to its basin ("bay of bengal" -> indian), not the keyword default
+    known = marine_regions.region_by_key(region_canonical) if marine_regions is not None else None
+    if known:
+        region = known["basin"]
+
+    # submitted coordinates take precedence over keywords: map them to a marine region
+    region_info = None
+    if latitude is not None and longitude is not None and marine_regions is not None:
+        region_info = marine_regions.lookup(latitude, longitude)
+        if region_info:
+            region = region_info["basin"]
+            region_canonical = region_info["key"]
+    return region, region_canonical, region_info
+
+
+def popular_fishes_key(region_canonical: Optional[str], region: str) -> str:
+    """OCEAN_POPULAR_FISHES key for a region: the specific area, then its basin, then default."""
+    for key in (region_canonical, region):
+        if key in OCEAN_POPULAR_FISHES:
+            return key
+    return "default"
+
+
+def build_feature_row(species: str, region: str, scientific_name: Optional[str] = None,
+                      latitude: Optional[float] = None, longitude: Optional[float] = None) -> dict:
+    """Feature values keyed (and ordered) by model_feature_order, or the default order."""
     features = {
         'Species_Name': species.title(),
-        'Scientific_Name': SPECIES_TO_SCIENTIFIC.get(species, ""),
+        'Scientific_Name': scientific_name if scientific_name is not None else SPECIES_TO_SCIENTIFIC.get(species, ""),
         'Region': region.title(),
-        'Latitude': 0.0,
-        'Longitude': 0.0,
+        'Latitude': float(latitude) if latitude is not None else 0.0,
+        'Longitude': float(longitude) if longitude is not None else 0.0,
         'Year': 2024,
         'Month': 6,
         'Sea_Surface_Temperature_C': 15.0,
@@ -189,7 +411,74 @@ def build_feature_dataframe(species: str, region: str) -> pd.DataFrame:
     for col in order:
         if col not in features:
             features[col] = ""
-    return pd.DataFrame([features], columns=order)
+    return {col: features[col] for col in order}
+
+
+def build_feature_dataframe(species: str, region: str, scientific_name: Optional[str] = None) -> pd.DataFrame:
+    row = build_feature_row(species, region, scientific_name)
+    return pd.DataFrame([row], columns=list(row))
+
+
+def build_feature_batch(species: List[dict], region: str) -> pd.DataFrame:
+    """One feature row per {"species", "scientificName"} entry, as a single frame."""
+    rows = [build_feature_row(s["species"], region, s["scientificName"]) for s in species]
+    return pd.DataFrame(rows, columns=list(rows[0]))
+
+
+def region_species(region_canonical: Optional[str], region: str):
+    """
+    (table key, species entries, source) for a region summary: the most observed species
+    of the specific area, then its basin, from region_species_table ("occurrences"); the
+    static OCEAN_POPULAR_FISHES list when there is no table entry ("static").
+    """
+    for key in (region_canonical, region):
+        if region_species_table and region_species_table.get(key):
+            species = []
+            for e in region_species_table[key]:
+                # Species_Name must be a common name the model has seen; the binomial
+                # only goes into Scientific_Name (unknown species keep it in both)
+                common = common_species_name(e["scientificName"])
+                species.append({"species": common or e["scientificName"], "name": common or e["scientificName"],
+                                "scientificName": e["scientificName"], "occurrences": e.get("occurrences")})
+            return key, species, "occurrences"
+
+    top_key = popular_fishes_key(region_canonical, region)
+    species = []
+    for name in OCEAN_POPULAR_FISHES.get(top_key, OCEAN_POPULAR_FISHES["default"]):
+        key = name.lower()
+        scientific = SPECIES_TO_SCIENTIFIC.get(key)
+        if scientific is None:
+            match = species_resolver.best_match(key, allowed_ranks=PREDICTION_RANKS)
+            # fuzzy hits like "indian mackerel" -> "mackerel" would pick the wrong species
+            scientific = match.scientific_name if match and match.matched_name.lower() == key else ""
+        species.append({"species": key, "name": name, "scientificName": scientific})
+    return top_key, species, "static"
+
+
+def compute_region_summary(region: str, species: List[dict]) -> dict:
+    """Score every species of the region in one model call (fallback generator without a model)."""
+    if model_loaded and model is not None:
+        feature_df = build_feature_batch(species, region)
+        if hasattr(model, "predict_proba"):
+            proba = model.predict_proba(feature_df)
+            classes = getattr(model, "classes_", None)
+            classes = list(classes) if classes is not None else list(range(proba.shape[1]))
+            summary = summarize_probabilities(species, proba, classes)
+        else:
+            preds = model.predict(feature_df)
+            summary = summarize_statuses([{**s, "stockStatus": stock_status(p)} for s, p in zip(species, preds)])
+        source = "MODEL_PIPELINE"
+    else:
+        entries = []
+        for s in species:
+            fallback = generate_intelligent_prediction(s["species"], region)
+            change = float(fallback["fishPopulation"].rstrip("%"))
+            status = "Declining" if change < -2 else "Increasing" if change > 2 else "Stable"
+            entries.append({**s, "stockStatus": status, "fishPopulation": fallback["fishPopulation"]})
+        summary = summarize_statuses(entries)
+        source = "MODEL_FORCED"
+    return {**safe_serialize(summary), "source": source, "model_version": model_version,
+            "computed_at": datetime.now(timezone.utc).isoformat()}
 
 # ------------------ Endpoints ------------------
 @app.get("/")
@@ -199,6 +488,13 @@ async def home():
         "model_loaded": model_loaded,
         "endpoints": {
             "predict": "POST /predict",
+            "predict_batch": "POST /predict/batch (application/octet-stream .npz -> .npy)",
+            "shadow": "GET /shadow",
+            "drift": "GET /drift",
+            "audit": "GET /audit",
+            "telemetry": "GET /admin/telemetry",
+            "region_summary": "POST /region_summary",
+            "regions_classify": "POST /regions/classify",
             "model_info": "GET /model_info",
             "ready": "GET /ready"
         }
@@ -210,29 +506,20 @@ async def ready():
 
 @app.post("/predict")
 async def predict(input_data: PredictionInput):
+    request_started = time.perf_counter()
     query_raw = (input_data.query or "").strip()
     query = query_raw.lower()
 
-    # detect species and region
-    species = next((s for s in SPECIES_TO_SCIENTIFIC.keys() if s in query), "tuna")
-    region = next((r for r in ["pacific", "atlantic", "mediterranean", "north", "south", "indian"] if r in query), "pacific")
+    # detect species (fuzzy, against the species index) and region
+    species_match = species_resolver.resolve_in_query(query)
+    species = species_match.name if species_match else "tuna"
+    scientific_name = species_match.scientific_name if species_match else None
+    latitude, longitude = input_data.latitude, input_data.longitude
+    region, region_canonical, region_info = parse_region(query, latitude, longitude)
 
-    # try to infer a canonical region name if user typed a specific area
-    region_canonical = None
-    if "bay of bengal" in query or "bayofbengal" in query:
-        region_canonical = "bayofbengal"
-    elif "pacific" in query:
-        region_canonical = "pacific"
-    elif "atlantic" in query:
-        region_canonical = "atlantic"
-    elif "mediterranean" in query:
-        region_canonical = "mediterranean"
-    elif "indian" in query:
-        region_canonical = "indian"
-    else:
-        region_canonical = region
-
-    feature_df = build_feature_dataframe(species, region)
+    feature_row = build_feature_row(species, region, scientific_name, latitude, longitude)
+    feature_df = pd.DataFrame([feature_row], columns=list(feature_row))
+    record_drift(feature_row, feature_df)
 
     # decide if this is an ocean/composite query
     ocean_terms = ("ocean", "sea", "bay", "gulf", "bayofbengal")
@@ -241,8 +528,13 @@ async def predict(input_data: PredictionInput):
     try:
         # ========== MODEL PATH ==========
         if model_loaded and model is not None:
+            started = time.perf_counter()
             preds = model.predict(feature_df)
+            primary_ms = (time.perf_counter() - started) * 1000
             prediction_class = preds[0] if len(preds) else None
+            if shadow is not None:
+                shadow.submit(feature_df, prediction_class, primary_ms,
+                              busy=inflight_requests > SHADOW_MAX_INFLIGHT)
 
             try:
                 proba = model.predict_proba(feature_df)[0]
@@ -298,10 +590,12 @@ async def predict(input_data: PredictionInput):
             result = {**fallback, "query": query, "species": species, "region": region, "regionCanonical": region_canonical, "model_used": True, "source": "MODEL_FORCED"}
 
         # ========== ADD SCIENTIFIC NAME WHEN QUERY MENTIONS A SPECIES ==========
-        # only add if the user explicitly typed a known species in their query
-        explicitly_mentioned_species = next((s for s in SPECIES_TO_SCIENTIFIC.keys() if s in query), None)
-        if explicitly_mentioned_species:
-            result["Scientific_Name"] = SPECIES_TO_SCIENTIFIC.get(explicitly_mentioned_species)
+        # only add if the resolver matched a species in the user's query
+        if species_match:
+            result["Scientific_Name"] = species_match.scientific_name
+            result["speciesMatch"] = species_match.to_dict()
+        if region_info:
+            result["regionName"] = region_info["name"]
 
         # ========== ADD OCEAN METRICS + TOP FISHES WHEN IT'S AN OCEAN QUERY ==========
         if is_ocean_query:
@@ -320,22 +614,76 @@ async def predict(input_data: PredictionInput):
             }
 
             # populate top 5 fishes using regionCanonical mapping (fallback to default)
-            top_key = region_canonical if region_canonical in OCEAN_POPULAR_FISHES else "default"
+            top_key = popular_fishes_key(region_canonical, region)
             result["topFishes"] = OCEAN_POPULAR_FISHES.get(top_key, OCEAN_POPULAR_FISHES["default"])
 
+        record_audit(result, feature_row, request_started)
         return result
 
     except Exception as e:
         logger.exception("Prediction failed: %s", e)
         fallback = generate_intelligent_prediction(species, region)
         result = {**fallback, "query": query, "species": species, "region": region, "regionCanonical": region_canonical, "model_used": True, "source": "MODEL_FORCED", "error": str(e)}
-        if explicitly_mentioned_species:
-            result["Scientific_Name"] = SPECIES_TO_SCIENTIFIC.get(explicitly_mentioned_species)
+        if species_match:
+            result["Scientific_Name"] = species_match.scientific_name
+            result["speciesMatch"] = species_match.to_dict()
+        if region_info:
+            result["regionName"] = region_info["name"]
         if is_ocean_query:
-            top_key = region_canonical if region_canonical in OCEAN_POPULAR_FISHES else "default"
+            top_key = popular_fishes_key(region_canonical, region)
             result["topFishes"] = OCEAN_POPULAR_FISHES.get(top_key, OCEAN_POPULAR_FISHES["default"])
+        record_audit(result, feature_row, request_started)
         return result
 
+BATCH_MAX_BYTES = int(os.environ.get("OCEANAI_BATCH_MAX_BYTES", str(MAX_PAYLOAD_BYTES)))
+
+async def read_body_capped(request: Request, limit: int) -> bytes:
+    """Request body, or 413 as soon as Content-Length or the streamed size exceeds `limit`."""
+    declared = request.headers.get("content-length")
+    if declared is not None and declared.isdigit() and int(declared) > limit:
+        raise HTTPException(status_code=413, detail=f"Payload exceeds the limit of {limit} bytes")
+    chunks, size = [], 0
+    async for chunk in request.stream():
+        size += len(chunk)
+        if size > limit:
+            raise HTTPException(status_code=413, detail=f"Payload exceeds the limit of {limit} bytes")
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+def score_batch(payload: bytes):
+    """Decode a columnar payload, score it in one call and return (probabilities, classes)."""
+    feature_df = decode_columnar(payload, model_feature_order)
+    proba = np.asarray(model.predict_proba(feature_df), dtype=np.float32)
+    classes = getattr(model, "classes_", None)
+    return proba, [safe_serialize(c) for c in classes] if classes is not None else list(range(proba.shape[1]))
+
+
+@app.post("/predict/batch")
+async def predict_batch(request: Request):
+    """
+    Bulk scoring for pre-featurized rows. Body is an .npz columnar payload (see batch_codec);
+    response is an .npy float32 probability matrix, with class labels in X-OceanAI-Classes.
+    """
+    if not model_loaded or model is None:
+        raise HTTPException(status_code=503, detail="No model loaded; batch scoring unavailable")
+    if not hasattr(model, "predict_proba"):
+        raise HTTPException(status_code=501, detail="Loaded model does not implement predict_proba")
+
+    payload = await read_body_capped(request, BATCH_MAX_BYTES)
+    try:
+        proba, classes = await run_in_threadpool(score_batch, payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.exception("Batch prediction failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"Batch prediction failed: {e}")
+
+    return Response(
+        content=encode_array(proba),
+        media_type="application/octet-stream",
+        headers={"X-OceanAI-Classes": json.dumps(classes), "X-OceanAI-Rows": str(proba.shape[0])},
+    )
+
 # ------------------ Safe Serializer ------------------
 def safe_serialize(obj):
     try:
@@ -398,6 +746,81 @@ async def model_info():
 
     return info
 
+@app.get("/shadow")
+async def shadow_stats():
+    if shadow is None:
+        return {"enabled": False}
+    return safe_serialize(shadow.stats())
+
+@app.get("/drift")
+async def drift():
+    info = {"rows": drift_monitor.rows if drift_monitor else 0,
+            "reference": DRIFT_REFERENCE if drift_reference else None}
+    if drift_monitor is not None:
+        # without a reference every live column is listed as "no reference" with its live stats
+        info["features"] = drift_monitor.drift_scores(drift_reference or FeatureDriftMonitor())
+    return safe_serialize(info)
+
+@app.get("/drift/sketch")
+async def drift_sketch():
+    """Serialized live sketches of this worker, for merging across workers (drift_monitor.py merge)."""
+    return {"pid": os.getpid(), "monitor": drift_monitor.to_dict() if drift_monitor else None}
+
+@app.post("/regions/classify")
+async def regions_classify(input_data: RegionClassifyInput):
+    """Batch coordinate -> marine region lookup (one vectorized call for all points)."""
+    if marine_regions is None:
+        raise HTTPException(status_code=503, detail="Marine region index unavailable")
+    if len(input_data.latitudes) != len(input_data.longitudes):
+        raise HTTPException(status_code=400, detail="latitudes and longitudes must have the same length")
+    started = time.perf_counter()
+    regions = marine_regions.classify_points(input_data.latitudes, input_data.longitudes)
+    return {
+        "count": len(regions),
+        "regions": regions,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+
+@app.post("/region_summary")
+async def region_summary(input_data: PredictionInput):
+    """Score every relevant species of the query's region in one batch; ranked by risk."""
+    started = time.perf_counter()
+    query = (input_data.query or "").strip().lower()
+    region, region_canonical, region_info = parse_region(query, input_data.latitude, input_data.longitude)
+    species_key, species, species_source = region_species(region_canonical, region)
+    try:
+        # fallback-generator output is random, so only model-scored summaries are cached
+        summary = await run_in_threadpool(
+            region_summaries.get_or_compute,
+            (species_key, species_source, region, model_version),
+            lambda: compute_region_summary(region, species),
+            lambda s: s["source"] != "MODEL_FORCED",
+        )
+    except Exception as e:
+        logger.exception("Region summary failed: %s", e)
+        raise HTTPException(status_code=500, detail=f"Region summary failed: {e}")
+    result = {"query": query, "region": region, "regionCanonical": region_canonical,
+              "speciesSource": species_source, **summary}
+    if region_info:
+        result["regionName"] = region_info["name"]
+    result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 3)
+    return result
+
+@app.get("/audit")
+async def audit_stats():
+    if audit_log is None:
+        return {"enabled": False}
+    return {"enabled": True, "model_version": model_version, **audit_log.stats()}
+
+@app.get("/admin/telemetry")
+async def admin_telemetry(top: int = 10):
+    """
+    Process memory/GC/model/pool telemetry; `top` tracemalloc allocators when tracing is on.
+    Model footprints are measured on the first call (pickled size, or the artifact file size
+    for XGBoost models, which are not re-serialized) and cached afterwards.
+    """
+    return await run_in_threadpool(telemetry.snapshot, max(0, min(top, 100)))
+
 # ------------------ Entrypoint ------------------
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,183 @@
+# marine_regions.py
+"""
+Point-in-polygon marine region classifier.
+
+Region outlines (ocean basins, seas, bays, gulfs) are read from a local GeoJSON file
+(data/marine_regions.json, [lon, lat] coordinates). Smaller regions take priority, so a
+point in the Bay of Bengal resolves to "bayofbengal" (basin "indian"), not just "indian".
+
+Lookups use a precomputed lat/lon grid built at load time:
+    - cells that no polygon edge passes through are entirely inside (or outside) every
+      region, so their answer is stored directly in the grid;
+    - only points in the remaining boundary cells get an exact, vectorized ray-casting test
+      against the polygons whose bounding box contains them.
+
+Usage:
+    index = MarineRegionIndex.load()
+    ids = index.classify(lats, lons)           # numpy array of region ids (-1 = none)
+    index.lookup(13.0, 88.0)                   # {"key": "bayofbengal", "name": "Bay of Bengal", ...}
+
+Usage (CLI):
+    python marine_regions.py 13.0 88.0
+"""
+
+from pathlib import Path
+import sys
+import json
+import logging
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("marine_regions")
+logger.setLevel(logging.INFO)
+
+DEFAULT_REGIONS_PATH = Path(__file__).parent / "data" / "marine_regions.json"
+DEFAULT_RESOLUTION = 1.0
+# grid cell markers
+NO_REGION = -1
+NEEDS_EXACT = -2
+
+
+def _ring_area(ring: np.ndarray) -> float:
+    x, y = ring[:, 0], ring[:, 1]
+    return 0.5 * abs(float(np.dot(x, np.roll(y, -1)) - np.dot(y, np.roll(x, -1))))
+
+
+def points_in_ring(lons: np.ndarray, lats: np.ndarray, ring: np.ndarray) -> np.ndarray:
+    """Even-odd ray casting, vectorized over points x edges."""
+    x1, y1 = ring[:, 0], ring[:, 1]
+    x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+    px, py = lons[:, None], lats[:, None]
+    crosses = (y1 > py) != (y2 > py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        x_at = x1 + (py - y1) * (x2 - x1) / (y2 - y1)
+    return np.count_nonzero(crosses & (px < x_at), axis=1) % 2 == 1
+
+
+class MarineRegionIndex:
+    """Region metadata + polygon rings + precomputed grid."""
+
+    def __init__(self, regions: List[Dict[str, Any]], rings: List[Tuple[int, np.ndarray]],
+                 resolution: float = DEFAULT_RESOLUTION):
+        self.regions = regions
+        self.keys = [r["key"] for r in regions]
+        # smallest polygons first so seas/bays win over the basins that contain them
+        self.rings = sorted(rings, key=lambda item: _ring_area(item[1]))
+        self.bboxes = np.array([[r[:, 0].min(), r[:, 1].min(), r[:, 0].max(), r[:, 1].max()]
+                                for _, r in self.rings])
+        self.resolution = resolution
+        self.grid = self._build_grid()
+
+    @classmethod
+    def load(cls, path: Optional[str] = None, resolution: float = DEFAULT_RESOLUTION) -> "MarineRegionIndex":
+        path = Path(path) if path else DEFAULT_REGIONS_PATH
+        data = json.loads(path.read_text())
+        regions, rings = [], []
+        for feature in data.get("features", []):
+            props = feature.get("properties", {})
+            geom = feature.get("geometry", {})
+            polygons = geom["coordinates"] if geom.get("type") == "MultiPolygon" else [geom["coordinates"]]
+            region_id = len(regions)
+            regions.append({k: props.get(k) for k in ("key", "name", "basin", "type")})
+            for polygon in polygons:
+                # outer ring only; the coarse outlines have no holes
+                ring = np.asarray(polygon[0], dtype=np.float64)
+                if len(ring) > 1 and np.array_equal(ring[0], ring[-1]):
+                    ring = ring[:-1]
+                rings.append((region_id, ring))
+        index = cls(regions, rings, resolution)
+        logger.info("Loaded %d marine regions (%d polygons) from %s; %.0f%% of grid cells precomputed",
+                    len(regions), len(rings), path, 100 * float(np.mean(index.grid != NEEDS_EXACT)))
+        return index
+
+    # ------------------ Grid ------------------
+    def _cell(self, lats: np.ndarray, lons: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        n_rows, n_cols = self.grid_shape
+        rows = np.clip(((lats + 90.0) / self.resolution).astype(np.int64), 0, n_rows - 1)
+        cols = np.clip(((lons + 180.0) / self.resolution).astype(np.int64), 0, n_cols - 1)
+        return rows, cols
+
+    @property
+    def grid_shape(self) -> Tuple[int, int]:
+        return int(round(180 / self.resolution)), int(round(360 / self.resolution))
+
+    def _build_grid(self) -> np.ndarray:
+        n_rows, n_cols = self.grid_shape
+        touched = np.zeros((n_rows, n_cols), dtype=bool)
+        res = self.resolution
+        for _, ring in self.rings:
+            a, b = ring, np.roll(ring, -1, axis=0)
+            lo = np.minimum(a, b)
+            hi = np.maximum(a, b)
+            r0 = np.clip(((lo[:, 1] + 90) / res).astype(int), 0, n_rows - 1)
+            r1 = np.clip(((hi[:, 1] + 90) / res).astype(int), 0, n_rows - 1)
+            c0 = np.clip(((lo[:, 0] + 180) / res).astype(int), 0, n_cols - 1)
+            c1 = np.clip(((hi[:, 0] + 180) / res).astype(int), 0, n_cols - 1)
+            for i0, i1, j0, j1 in zip(r0, r1, c0, c1):
+                touched[i0:i1 + 1, j0:j1 + 1] = True
+
+        grid = np.full((n_rows, n_cols), NEEDS_EXACT, dtype=np.int16)
+        rows, cols = np.nonzero(~touched)
+        centre_lats = -90 + (rows + 0.5) * res
+        centre_lons = -180 + (cols + 0.5) * res
+        grid[rows, cols] = self._classify_exact(centre_lats, centre_lons)
+        return grid
+
+    # ------------------ Classification ------------------
+    def _classify_exact(self, lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+        out = np.full(len(lats), NO_REGION, dtype=np.int16)
+        pending = np.ones(len(lats), dtype=bool)
+        for (region_id, ring), (x0, y0, x1, y1) in zip(self.rings, self.bboxes):
+            cand = np.flatnonzero(pending & (lons >= x0) & (lons <= x1) & (lats >= y0) & (lats <= y1))
+            if len(cand) == 0:
+                continue
+            hit = cand[points_in_ring(lons[cand], lats[cand], ring)]
+            out[hit] = region_id
+            pending[hit] = False
+            if not pending.any():
+                break
+        return out
+
+    def classify(self, lats, lons) -> np.ndarray:
+        """Region id per point (index into self.regions), NO_REGION when outside every polygon."""
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lons = np.asarray(lons, dtype=np.float64).ravel()
+        if lats.shape != lons.shape:
+            raise ValueError("latitudes and longitudes must have the same length")
+        valid = np.isfinite(lats) & np.isfinite(lons) & (np.abs(lats) <= 90) & (np.abs(lons) <= 180)
+        # +180 and -180 are the same meridian; the polygons are split at -180
+        lons = np.where(lons == 180.0, -180.0, lons)
+        ids = np.full(len(lats), NO_REGION, dtype=np.int16)
+        rows, cols = self._cell(np.where(valid, lats, 0.0), np.where(valid, lons, 0.0))
+        ids[valid] = self.grid[rows[valid], cols[valid]]
+        exact = np.flatnonzero(ids == NEEDS_EXACT)
+        if len(exact):
+            ids[exact] = self._classify_exact(lats[exact], lons[exact])
+        return ids
+
+    def region_by_key(self, key: Optional[str]) -> Optional[Dict[str, Any]]:
+        return self.region(self.keys.index(key)) if key in self.keys else None
+
+    def region(self, region_id: int) -> Optional[Dict[str, Any]]:
+        return dict(self.regions[region_id]) if region_id >= 0 else None
+
+    def classify_points(self, lats, lons) -> List[Optional[Dict[str, Any]]]:
+        return [self.region(int(i)) for i in self.classify(lats, lons)]
+
+    def lookup(self, lat: float, lon: float) -> Optional[Dict[str, Any]]:
+        return self.region(int(self.classify([lat], [lon])[0]))
+
+
+# CLI runner
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 3:
+        print("Usage: python marine_regions.py <lat> <lon>")
+        sys.exit(1)
+    index = MarineRegionIndex.load()
+    print(json.dumps(index.lookup(float(sys.argv[1]), float(sys.argv[2])), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -25,12 +25,14 @@ import json
 
 # Use your validate_model loader to safely load artifacts
 from validate_model import ModelValidator
+from species_resolver import load_resolver, SpeciesMatch
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("predict_single")
 
 # Default model path - adjust if needed
 DEFAULT_MODEL_PATH = Path(__file__).parent / "models" / "oceanai_model_v1.pkl"
+DEFAULT_SPECIES_INDEX = Path(__file__).parent / "models" / "species_index.npz"
 
 SPECIES_TO_SCIENTIFIC = {
     "tuna": "Thunnus spp.",
@@ -52,18 +54,47 @@ DEFAULT_ORDER = [
 ]
 
 
-def parse_query_for_species_region(query: str) -> Tuple[str, str]:
+_species_resolver = None
+_marine_regions = None
+
+
+def get_species_resolver():
+    """Lazily load the species index (or the built-in table when no index exists)."""
+    global _species_resolver
+    if _species_resolver is None:
+        _species_resolver = load_resolver(str(DEFAULT_SPECIES_INDEX), seed=SPECIES_TO_SCIENTIFIC)
+    return _species_resolver
+
+
+def resolve_species(query: str) -> Optional[SpeciesMatch]:
+    return get_species_resolver().resolve_in_query(query or "")
+
+
+def get_marine_regions():
+    """Lazily load the marine region polygons (coordinates -> basin/sea)."""
+    global _marine_regions
+    if _marine_regions is None:
+        from marine_regions import MarineRegionIndex
+        _marine_regions = MarineRegionIndex.load()
+    return _marine_regions
+
+
+def parse_query_for_species_region(query: str) -> Tuple[str, str, Optional[SpeciesMatch]]:
+    """(species, region, resolver match or None); species defaults to "tuna" when nothing matched."""
     q = (query or "").lower()
-    species = next((s for s in SPECIES_TO_SCIENTIFIC.keys() if s in q), "tuna")
+    match = resolve_species(q)
+    species = match.name if match else "tuna"
     region = next((r for r in ["pacific", "atlantic", "mediterranean", "north", "south", "indian", "arctic"] if r in q), "pacific")
-    return species, region
+    return species, region, match
 
 
-def build_feature_dataframe(species: str, region: str, feature_order: Optional[list] = None) -> pd.DataFrame:
+def build_feature_dataframe(species: str, region: str, feature_order: Optional[list] = None,
+                            scientific_name: Optional[str] = None, latitude: Optional[float] = None,
+                            longitude: Optional[float] = None) -> pd.DataFrame:
     """Return a one-row dataframe whose columns match the expected feature_order (or DEFAULT_ORDER)."""
     features = {
         'Species_Name': species.title(),
-        'Scientific_Name': SPECIES_TO_SCIENTIFIC.get(species, ""),
+        'Scientific_Name': scientific_name if scientific_name is not None else SPECIES_TO_SCIENTIFIC.get(species, ""),
         'Region': region.title(),
         'Latitude': 0.0,
         'Longitude': 0.0,
@@ -106,6 +137,8 @@ def build_feature_dataframe(species: str, region: str, feature_order: Optional[l
     }
     if r in region_mapping:
         features.update(region_mapping[r])
+    if latitude is not None and longitude is not None:
+        features.update({'Latitude': float(latitude), 'Longitude': float(longitude)})
 
     order = feature_order if feature_order else DEFAULT_ORDER
     # ensure keys exist
@@ -160,7 +193,8 @@ def predict_with_model(model_obj, X: pd.DataFrame) -> Dict[str, Any]:
     return out
 
 
-def run_query(query: str, model_path: Optional[str] = None) -> Dict[str, Any]:
+def run_query(query: str, model_path: Optional[str] = None, latitude: Optional[float] = None,
+              longitude: Optional[float] = None) -> Dict[str, Any]:
     """
     Full pipeline: load model (if path), build features, run prediction and return human friendly dict.
     """
@@ -173,8 +207,15 @@ def run_query(query: str, model_path: Optional[str] = None) -> Dict[str, Any]:
     model_obj, feature_names = safe_load_model(model_path)
     logger.info("✅ Loaded model from %s", model_path)
 
-    species, region = parse_query_for_species_region(query)
-    X = build_feature_dataframe(species, region, feature_order=feature_names)
+    species, region, match = parse_query_for_species_region(query)
+    region_info = None
+    if latitude is not None and longitude is not None:
+        region_info = get_marine_regions().lookup(latitude, longitude)
+        if region_info:
+            region = region_info["basin"]
+    X = build_feature_dataframe(species, region, feature_order=feature_names,
+                                scientific_name=match.scientific_name if match else None,
+                                latitude=latitude, longitude=longitude)
 
     try:
         res = predict_with_model(model_obj, X)
@@ -233,6 +274,12 @@ def run_query(query: str, model_path: Optional[str] = None) -> Dict[str, Any]:
         "confidence": f"{int(max_conf) if max_conf is not None else random.randint(78,95)}%",
         "model_path": str(model_path)
     }
+    if match:
+        result["Scientific_Name"] = match.scientific_name
+        result["speciesMatch"] = match.to_dict()
+    if region_info:
+        result["regionCanonical"] = region_info["key"]
+        result["regionName"] = region_info["name"]
     return result
 
 
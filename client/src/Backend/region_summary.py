@@ -0,0 +1,239 @@
+# region_summary.py
+"""
+Region-level composite prediction: score every relevant species of a region at once.
+
+The caller builds one feature row per species and hands the whole frame to the model in a
+single predict_proba() call. Probabilities are mapped onto stock-status labels
+(Declining / Stable / Increasing), species are ranked by risk (probability of
+"Declining"), and the region gets an aggregate health score:
+
+    health = 100 * mean over species of sum_label P(label) * STATUS_WEIGHTS[label]
+
+Summaries are cached per (region, model version) in a small thread-safe LRU, so a
+dashboard refresh costs one dictionary lookup after the first call. Callers can mark a
+result as not cacheable (e.g. output of the random fallback generator).
+
+Which species belong to a region comes from occurrence data: build_region_species()
+classifies every occurrence's coordinates with marine_regions and keeps the most
+frequently observed species per region key and per basin (region_species.json).
+
+Usage:
+    summarizer = RegionSummarizer(cache_size=64)
+    summary = summarizer.get_or_compute(("bayofbengal", "indian", "oceanai_model_v1.pkl"),
+                                        lambda: summarize_probabilities(species, proba, classes))
+
+Usage (CLI):
+    python region_summary.py build fish_data_cleaned_final.csv models/region_species.json [--top 15]
+"""
+
+from collections import OrderedDict, Counter
+from pathlib import Path
+import sys
+import json
+import argparse
+import threading
+import logging
+from typing import Optional, Dict, Any, List, Callable, Hashable, Sequence
+
+import numpy as np
+
+logger = logging.getLogger("region_summary")
+logger.setLevel(logging.INFO)
+
+DEFAULT_CACHE_SIZE = 64
+DEFAULT_TOP_SPECIES = 15
+# integer classes are interpreted the same way /predict does
+CLASS_LABELS = {0: "Declining", 1: "Stable", 2: "Increasing"}
+# contribution of each status to the health score (0 = collapsing, 1 = growing)
+STATUS_WEIGHTS = {"Declining": 0.0, "Stable": 0.5, "Increasing": 1.0}
+
+
+def stock_status(prediction_class) -> str:
+    """Human label for a model class (string labels pass through, ints map via CLASS_LABELS)."""
+    if prediction_class is None:
+        return "Unknown"
+    if isinstance(prediction_class, str):
+        return prediction_class
+    try:
+        return CLASS_LABELS.get(int(prediction_class), str(prediction_class))
+    except (TypeError, ValueError):
+        return str(prediction_class)
+
+
+def summarize_probabilities(species: Sequence[Dict[str, Any]], proba: np.ndarray,
+                            classes: Sequence) -> Dict[str, Any]:
+    """
+    Turn an (n_species, n_classes) probability matrix into ranked per-species entries and a
+    health score. `species` rows carry at least "species"; extra keys are copied through.
+    """
+    proba = np.asarray(proba, dtype=np.float64)
+    labels = [stock_status(c) for c in classes]
+    weights = np.array([STATUS_WEIGHTS.get(label, np.nan) for label in labels])
+    known = ~np.isnan(weights)
+    declining = np.array([label == "Declining" for label in labels])
+
+    # all row-wise quantities in one pass over the matrix
+    top = proba.argmax(axis=1)
+    risk = proba[:, declining].sum(axis=1) if declining.any() else np.full(len(proba), np.nan)
+    health = (proba[:, known] @ weights[known]) / np.maximum(proba[:, known].sum(axis=1), 1e-12) \
+        if known.any() else np.full(len(proba), np.nan)
+
+    entries = []
+    for i, info in enumerate(species):
+        entries.append({
+            **info,
+            "stockStatus": labels[top[i]],
+            "confidence": round(float(proba[i, top[i]]), 4),
+            "riskScore": None if np.isnan(risk[i]) else round(float(risk[i]), 4),
+            "probabilities": {label: round(float(p), 4) for label, p in zip(labels, proba[i])},
+        })
+    return {
+        "species": rank_by_risk(entries),
+        "healthScore": None if np.isnan(health).all() else round(float(100 * np.nanmean(health)), 1),
+        "statusCounts": status_counts(entries),
+    }
+
+
+def summarize_statuses(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Summary for entries that only carry a stockStatus (e.g. from the fallback generator)."""
+    for entry in entries:
+        weight = STATUS_WEIGHTS.get(entry.get("stockStatus"))
+        entry.setdefault("riskScore", None if weight is None else round(1.0 - weight, 4))
+    scored = [STATUS_WEIGHTS[e["stockStatus"]] for e in entries if e.get("stockStatus") in STATUS_WEIGHTS]
+    return {
+        "species": rank_by_risk(entries),
+        "healthScore": round(100 * float(np.mean(scored)), 1) if scored else None,
+        "statusCounts": status_counts(entries),
+    }
+
+
+def rank_by_risk(entries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Highest risk first; entries without a risk score go last, in their original order."""
+    ranked = sorted(entries, key=lambda e: (e.get("riskScore") is None, -(e.get("riskScore") or 0.0)))
+    for rank, entry in enumerate(ranked, start=1):
+        entry["riskRank"] = rank
+    return ranked
+
+
+def status_counts(entries: List[Dict[str, Any]]) -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+    for entry in entries:
+        counts[entry["stockStatus"]] = counts.get(entry["stockStatus"], 0) + 1
+    return counts
+
+
+class RegionSummarizer:
+    """Thread-safe LRU of computed region summaries keyed by (region..., model version)."""
+
+    def __init__(self, cache_size: int = DEFAULT_CACHE_SIZE):
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Hashable, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            summary = self._cache.get(key)
+            if summary is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return summary
+
+    def put(self, key: Hashable, summary: Dict[str, Any]):
+        with self._lock:
+            self._cache[key] = summary
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Dict[str, Any]],
+                       cacheable: Optional[Callable[[Dict[str, Any]], bool]] = None) -> Dict[str, Any]:
+        """
+        Cached summary plus "cached": bool. A computed summary is stored only when
+        cacheable(summary) is true (default: always). Concurrent misses may compute twice.
+        """
+        summary = self.get(key)
+        if summary is not None:
+            return {**summary, "cached": True}
+        summary = compute()
+        if cacheable is None or cacheable(summary):
+            self.put(key, summary)
+        return {**summary, "cached": False}
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"entries": len(self._cache), "capacity": self.cache_size,
+                    "hits": self.hits, "misses": self.misses}
+
+
+# ------------------ Species per region ------------------
+def build_region_species(csv_path: str, regions, top_n: int = DEFAULT_TOP_SPECIES,
+                         chunksize: int = 200_000, encoding: str = "ISO-8859-1") -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Most observed species per marine region key and per basin, from an occurrence CSV
+    (decimalLatitude, decimalLongitude, scientificName). `regions` is a MarineRegionIndex.
+    """
+    import pandas as pd
+
+    counts: Counter = Counter()
+    cols = ["decimalLatitude", "decimalLongitude", "scientificName"]
+    for chunk in pd.read_csv(csv_path, usecols=cols, chunksize=chunksize, encoding=encoding, low_memory=False):
+        chunk = chunk.dropna()
+        if chunk.empty:
+            continue
+        ids = regions.classify(chunk["decimalLatitude"].to_numpy(), chunk["decimalLongitude"].to_numpy())
+        inside = ids >= 0
+        frame = pd.DataFrame({"region": ids[inside], "species": chunk["scientificName"].to_numpy()[inside]})
+        for (region_id, species), n in frame.groupby(["region", "species"]).size().items():
+            info = regions.regions[int(region_id)]
+            counts[(info["key"], species)] += int(n)
+            if info["basin"] != info["key"]:
+                # basins also cover their seas and bays
+                counts[(info["basin"], species)] += int(n)
+
+    table: Dict[str, List[Dict[str, Any]]] = {}
+    for (key, species), n in counts.most_common():
+        entries = table.setdefault(key, [])
+        if len(entries) < top_n:
+            entries.append({"scientificName": species, "occurrences": n})
+    logger.info("Region species table: %d regions from %s", len(table), csv_path)
+    return table
+
+
+def load_region_species(path: Optional[str]) -> Optional[Dict[str, List[Dict[str, Any]]]]:
+    if not path or not Path(path).exists():
+        return None
+    try:
+        return json.loads(Path(path).read_text())
+    except Exception as e:
+        logger.warning("Region species table load failed for %s: %s", path, e)
+        return None
+
+
+# CLI runner
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Build the species-per-region table used by /region_summary")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_build = sub.add_parser("build", help="count occurrences per marine region from a cleaned occurrence CSV")
+    p_build.add_argument("csv")
+    p_build.add_argument("output")
+    p_build.add_argument("--top", type=int, default=DEFAULT_TOP_SPECIES)
+    args = parser.parse_args(argv)
+
+    from marine_regions import MarineRegionIndex
+
+    logging.basicConfig(level=logging.INFO)
+    table = build_region_species(args.csv, MarineRegionIndex.load(), top_n=args.top)
+    Path(args.output).write_text(json.dumps(table, indent=1))
+    print(json.dumps({k: len(v) for k, v in table.items()}, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,207 @@
+# shadow_eval.py
+"""
+Shadow evaluation of a candidate model on live traffic.
+
+The primary model answers the request as usual; the same feature frame is handed to a
+ShadowEvaluator which scores it with the candidate on a background thread, off the
+response path. Work goes through a small bounded queue: when the queue is full (or the
+caller says the server is busy) the sample is dropped and counted, never queued.
+
+Recorded per primary class: samples, agreements, agreement rate and primary vs shadow
+predict() latency histograms (plus the same histograms over all classes).
+
+The shadow model runs in-process, so limit_threads() pins it to a single thread to keep
+it from competing with the primary model for every core.
+
+Usage:
+    shadow = ShadowEvaluator(candidate_model, version="oceanai_model_v2.pkl")
+    shadow.submit(feature_df, primary_class, primary_latency_ms)
+    shadow.stats()
+"""
+
+import threading
+import queue
+import time
+import logging
+from typing import Optional, Dict, Any, List
+
+import numpy as np
+
+from worker_queue import QueueWorkerStats
+
+logger = logging.getLogger("shadow_eval")
+logger.setLevel(logging.INFO)
+
+# upper bucket bounds in milliseconds; the last bucket is open-ended
+LATENCY_BUCKETS_MS = [0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, float("inf")]
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (constant memory, O(buckets) observe)."""
+
+    def __init__(self, bounds: Optional[List[float]] = None):
+        self.bounds = np.asarray(bounds or LATENCY_BUCKETS_MS, dtype=np.float64)
+        self.counts = np.zeros(len(self.bounds), dtype=np.int64)
+        self.total_ms = 0.0
+
+    def observe(self, ms: float):
+        self.counts[int(np.searchsorted(self.bounds, ms))] += 1
+        self.total_ms += ms
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile (None when empty)."""
+        n = int(self.counts.sum())
+        if n == 0:
+            return None
+        idx = int(np.searchsorted(np.cumsum(self.counts), q * n))
+        bound = float(self.bounds[min(idx, len(self.bounds) - 1)])
+        return bound if np.isfinite(bound) else float(self.bounds[-2])
+
+    def to_dict(self) -> Dict[str, Any]:
+        n = int(self.counts.sum())
+        return {
+            "count": n,
+            "mean_ms": round(self.total_ms / n, 3) if n else None,
+            "p50_ms": self.quantile(0.50),
+            "p95_ms": self.quantile(0.95),
+            "p99_ms": self.quantile(0.99),
+            "buckets": {
+                ("+Inf" if not np.isfinite(b) else f"le_{b:g}ms"): int(c)
+                for b, c in zip(self.bounds, self.counts)
+            },
+        }
+
+
+def limit_threads(model, n_threads: int = 1):
+    """Set n_jobs / nthread on a model (and every step of a Pipeline) that supports them."""
+    steps = [step for _, step in model.steps] if hasattr(model, "steps") else [model]
+    for est in steps:
+        if not hasattr(est, "get_params"):
+            continue
+        params = est.get_params(deep=False)
+        updates = {k: n_threads for k in ("n_jobs", "nthread") if k in params}
+        if updates:
+            est.set_params(**updates)
+        # an already-fitted XGBoost booster keeps its own thread setting
+        if hasattr(est, "get_booster"):
+            try:
+                est.get_booster().set_param({"nthread": n_threads})
+            except Exception:
+                pass
+    return model
+
+
+class ShadowEvaluator(QueueWorkerStats):
+    """Scores a candidate model next to the primary on a single background worker."""
+
+    def __init__(self, model, version: str, max_queue: int = 32):
+        self.model = model
+        self.version = version
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self.submitted = 0
+        self.dropped = 0
+        self.scored = 0
+        self.errors = 0
+        self.per_class: Dict[str, Dict[str, int]] = {}
+        self.disagreements: Dict[str, int] = {}
+        self.primary_latency = LatencyHistogram()
+        self.shadow_latency = LatencyHistogram()
+        self._stopped = threading.Event()
+        self._worker = threading.Thread(target=self._run, name="shadow-eval", daemon=True)
+        self._worker.start()
+
+    def submit(self, feature_df, primary_class, primary_latency_ms: float, busy: bool = False) -> bool:
+        """Hand a scored row to the shadow worker. Never blocks; returns False if dropped."""
+        with self._lock:
+            self.submitted += 1
+            if busy or self._stopped.is_set():
+                self.dropped += 1
+                return False
+        try:
+            self._queue.put_nowait((feature_df, primary_class, primary_latency_ms))
+            return True
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+
+    def _run(self):
+        while not self._stopped.is_set():
+            try:
+                item = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if item is None:
+                break
+            feature_df, primary_class, primary_ms = item
+            try:
+                started = time.perf_counter()
+                preds = self.model.predict(feature_df)
+                shadow_ms = (time.perf_counter() - started) * 1000
+                shadow_class = preds[0] if len(preds) else None
+            except Exception as e:
+                logger.warning("Shadow model %s failed: %s", self.version, e)
+                with self._lock:
+                    self.errors += 1
+                continue
+            self._record(str(primary_class), str(shadow_class), primary_ms, shadow_ms)
+
+    def _record(self, primary: str, shadow: str, primary_ms: float, shadow_ms: float):
+        with self._lock:
+            self.scored += 1
+            entry = self.per_class.get(primary)
+            if entry is None:
+                entry = self.per_class[primary] = {"samples": 0, "agree": 0,
+                                                   "primary_latency": LatencyHistogram(),
+                                                   "shadow_latency": LatencyHistogram()}
+            entry["samples"] += 1
+            entry["primary_latency"].observe(primary_ms)
+            entry["shadow_latency"].observe(shadow_ms)
+            if primary == shadow:
+                entry["agree"] += 1
+            else:
+                key = f"{primary}->{shadow}"
+                self.disagreements[key] = self.disagreements.get(key, 0) + 1
+            self.primary_latency.observe(primary_ms)
+            self.shadow_latency.observe(shadow_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            agree = sum(c["agree"] for c in self.per_class.values())
+            return {
+                "enabled": True,
+                "shadow_version": self.version,
+                "submitted": self.submitted,
+                "scored": self.scored,
+                "dropped": self.dropped,
+                "errors": self.errors,
+                "queue_depth": self._queue.qsize(),
+                "agreement_rate": round(agree / self.scored, 4) if self.scored else None,
+                "disagreement_rate": round(1 - agree / self.scored, 4) if self.scored else None,
+                "per_class": {
+                    cls: {
+                        "samples": c["samples"],
+                        "agree": c["agree"],
+                        "agreement_rate": round(c["agree"] / c["samples"], 4),
+                        "latency": {
+                            "primary": c["primary_latency"].to_dict(),
+                            "shadow": c["shadow_latency"].to_dict(),
+                        },
+                    }
+                    for cls, c in self.per_class.items()
+                },
+                "disagreements": dict(self.disagreements),
+                "latency": {
+                    "primary": self.primary_latency.to_dict(),
+                    "shadow": self.shadow_latency.to_dict(),
+                },
+            }
+
+    def close(self, timeout: float = 2.0):
+        self._stopped.set()
+        try:
+            self._queue.put_nowait(None)
+        except queue.Full:
+            pass
+        self._worker.join(timeout=timeout)
@@ -0,0 +1,398 @@
+# species_resolver.py
+"""
+Fuzzy species / taxonomy resolver for OceanAI.
+
+Misspelled or common species names ("tunna", "atlantic salmon", "Gadus morua")
+are matched against a character trigram inverted index built from:
+    - the built-in common-name table (SPECIES_TO_SCIENTIFIC), and
+    - the taxonomy columns of the cleaned occurrence CSV
+      (kingdom, phylum, class, order, family, genus, specificEpithet, scientificName).
+
+The index is stored as a compact .npz file (CSR postings, no pickles) so it loads
+quickly and scoring a query is a single numpy bincount over the postings.
+
+Usage (CLI):
+    python species_resolver.py build fish_data_cleaned_final.csv models/species_index.npz
+    python species_resolver.py query "atlantic salmn" [models/species_index.npz]
+
+Also usable as an importable module:
+    from species_resolver import load_resolver
+    resolver = load_resolver("models/species_index.npz", seed=SPECIES_TO_SCIENTIFIC)
+    match = resolver.resolve_in_query("tunna stock in the pacific")
+"""
+
+from pathlib import Path
+import sys
+import json
+import logging
+import re
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Optional, Dict, List, Iterable, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("species_resolver")
+logger.setLevel(logging.INFO)
+
+NGRAM = 3
+TAXONOMY_COLUMNS = [
+    "kingdom", "phylum", "class", "order", "family", "genus", "specificEpithet"
+]
+# lower rank number = preferred when two names score the same
+RANK_PRIORITY = {
+    "common": 0, "species": 1, "genus": 2, "family": 3,
+    "order": 4, "class": 5, "phylum": 6, "kingdom": 7,
+}
+# ranks a query match may resolve to when the result is used as the predicted species;
+# genus/family/... hits (e.g. "animals" -> kingdom Animalia) stay in the candidate list only
+PREDICTION_RANKS = ("common", "species")
+# minimum similarity for a match to be used by the API
+DEFAULT_MIN_CONFIDENCE = 0.55
+# words that never name a species; skipped when scanning free-text queries
+STOPWORDS = {
+    "a", "an", "and", "the", "in", "of", "on", "at", "for", "to", "by", "near",
+    "stock", "stocks", "population", "populations", "status", "trend", "trends",
+    "ocean", "sea", "bay", "gulf", "fish", "fishes", "species", "predict",
+    "prediction", "forecast", "what", "is", "how", "will", "be", "2030",
+    "pacific", "atlantic", "indian", "arctic", "mediterranean", "north", "south",
+    "east", "west", "bengal",
+}
+
+
+@dataclass
+class SpeciesMatch:
+    name: str
+    scientific_name: str
+    rank: str
+    confidence: float
+    candidates: List[Dict[str, object]] = field(default_factory=list)
+    # indexed name that actually matched (e.g. "Gadus morhua" when name is the common "cod")
+    matched_name: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "scientificName": self.scientific_name,
+            "rank": self.rank,
+            "confidence": round(self.confidence, 3),
+            "matchedName": self.matched_name or self.name,
+            "candidates": self.candidates,
+        }
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase, strip accents and punctuation, collapse whitespace."""
+    text = unicodedata.normalize("NFKD", str(text or ""))
+    text = "".join(ch for ch in text if not unicodedata.combining(ch)).lower()
+    text = re.sub(r"[^a-z0-9 ]+", " ", text)
+    return " ".join(text.split())
+
+
+def char_ngrams(text: str, n: int = NGRAM) -> List[str]:
+    """Distinct padded character n-grams of an already-normalized name."""
+    padded = f"  {text} "
+    if len(padded) < n:
+        return [padded]
+    return list(dict.fromkeys(padded[i:i + n] for i in range(len(padded) - n + 1)))
+
+
+class SpeciesResolver:
+    """
+    Character n-gram inverted index over species/taxon names.
+
+    Attributes:
+        names: normalized lookup keys (one per indexed name)
+        labels: display names returned to callers
+        scientific: scientific name each key resolves to
+        ranks: taxonomic rank of each key ("common", "species", "genus", ...)
+    """
+
+    def __init__(self, names, labels, scientific, ranks, grams, indptr, indices, gram_counts):
+        self.names = np.asarray(names)
+        self.labels = np.asarray(labels)
+        self.scientific = np.asarray(scientific)
+        self.ranks = np.asarray(ranks)
+        self.grams = np.asarray(grams)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.gram_counts = np.asarray(gram_counts, dtype=np.int32)
+        self._gram_ids = {g: i for i, g in enumerate(self.grams.tolist())}
+        self._rank_priority = np.array(
+            [RANK_PRIORITY.get(r, len(RANK_PRIORITY)) for r in self.ranks.tolist()], dtype=np.int32
+        )
+        # scientific name -> common-name label (first indexed common name wins)
+        self._common_names: Dict[str, str] = {}
+        for label, sci, rank in zip(self.labels.tolist(), self.scientific.tolist(), self.ranks.tolist()):
+            if rank == "common":
+                self._common_names.setdefault(sci, label)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def common_name(self, scientific_name: str) -> Optional[str]:
+        """Indexed common name for a scientific name, if there is one."""
+        return self._common_names.get(scientific_name)
+
+    # ------------------ Building ------------------
+    @classmethod
+    def build(cls, entries: Iterable[Tuple[str, str, str, str]]) -> "SpeciesResolver":
+        """
+        Build an index from (name, label, scientific_name, rank) tuples.
+        Duplicate normalized names keep the entry with the best (lowest) rank priority.
+        """
+        best: Dict[str, Tuple[str, str, str]] = {}
+        for name, label, sci, rank in entries:
+            key = normalize_name(name)
+            if not key:
+                continue
+            prev = best.get(key)
+            if prev is None or RANK_PRIORITY.get(rank, 99) < RANK_PRIORITY.get(prev[2], 99):
+                best[key] = (str(label), str(sci), str(rank))
+
+        names = sorted(best)
+        gram_ids: Dict[str, int] = {}
+        postings: List[List[int]] = []
+        gram_counts = np.zeros(len(names), dtype=np.int32)
+        for doc_id, key in enumerate(names):
+            grams = char_ngrams(key)
+            gram_counts[doc_id] = len(grams)
+            for g in grams:
+                gid = gram_ids.get(g)
+                if gid is None:
+                    gid = gram_ids[g] = len(postings)
+                    postings.append([])
+                postings[gid].append(doc_id)
+
+        indptr = np.zeros(len(postings) + 1, dtype=np.int64)
+        indptr[1:] = np.cumsum([len(p) for p in postings])
+        indices = np.fromiter((d for p in postings for d in p), dtype=np.int32, count=int(indptr[-1]))
+        grams_sorted = [None] * len(gram_ids)
+        for g, gid in gram_ids.items():
+            grams_sorted[gid] = g
+
+        logger.info("Built species index: %d names, %d n-grams", len(names), len(grams_sorted))
+        return cls(
+            names=names,
+            labels=[best[k][0] for k in names],
+            scientific=[best[k][1] for k in names],
+            ranks=[best[k][2] for k in names],
+            grams=grams_sorted,
+            indptr=indptr,
+            indices=indices,
+            gram_counts=gram_counts,
+        )
+
+    # ------------------ Persistence ------------------
+    def save(self, path: str) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            names=self.names.astype(str),
+            labels=self.labels.astype(str),
+            scientific=self.scientific.astype(str),
+            ranks=self.ranks.astype(str),
+            grams=self.grams.astype(str),
+            indptr=self.indptr,
+            indices=self.indices,
+            gram_counts=self.gram_counts,
+        )
+        logger.info("Saved species index (%d names) to %s", len(self), path)
+        return path
+
+    @classmethod
+    def load(cls, path: str) -> "SpeciesResolver":
+        with np.load(str(path), allow_pickle=False) as data:
+            resolver = cls(**{k: data[k] for k in data.files})
+        logger.info("Loaded species index (%d names) from %s", len(resolver), path)
+        return resolver
+
+    # ------------------ Querying ------------------
+    def _score(self, name: str) -> Tuple[np.ndarray, np.ndarray]:
+        """(indices of names sharing at least one n-gram with `name`, their Dice similarity)."""
+        empty = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        key = normalize_name(name)
+        if not key or len(self) == 0:
+            return empty
+
+        gids = [self._gram_ids[g] for g in char_ngrams(key) if g in self._gram_ids]
+        n_query = len(char_ngrams(key))
+        if not gids:
+            return empty
+        postings = np.concatenate([self.indices[self.indptr[g]:self.indptr[g + 1]] for g in gids])
+        overlap = np.bincount(postings, minlength=len(self))
+        hit = np.flatnonzero(overlap)
+        return hit, 2.0 * overlap[hit] / (self.gram_counts[hit] + n_query)
+
+    def _rank_filter(self, hit: np.ndarray, scores: np.ndarray, allowed_ranks: Optional[Iterable[str]]):
+        if allowed_ranks is None:
+            return hit, scores
+        keep = np.isin(self._rank_priority[hit], [RANK_PRIORITY[r] for r in allowed_ranks])
+        return hit[keep], scores[keep]
+
+    def resolve(self, name: str, top_k: int = 5,
+                allowed_ranks: Optional[Iterable[str]] = None) -> List[Dict[str, object]]:
+        """
+        Rank indexed names by Dice similarity of their character n-grams with `name`,
+        optionally restricted to `allowed_ranks`.
+        Returns up to top_k dicts: {name, scientificName, rank, confidence}.
+        """
+        hit, scores = self._rank_filter(*self._score(name), allowed_ranks)
+        return self._top(hit, scores, top_k)
+
+    def _top(self, hit: np.ndarray, scores: np.ndarray, top_k: int) -> List[Dict[str, object]]:
+        k = min(top_k, len(hit))
+        if len(hit) > k:
+            part = np.argpartition(-scores, k - 1)[:k]
+            hit, scores = hit[part], scores[part]
+        # best score first; ties broken by rank priority (common name > species > genus ...)
+        order = np.lexsort((self._rank_priority[hit], -scores))
+        return [self._candidate(int(hit[i]), float(scores[i])) for i in order]
+
+    def best_match(self, name: str, min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+                   top_k: int = 5, allowed_ranks: Optional[Iterable[str]] = None) -> Optional[SpeciesMatch]:
+        """
+        Best name of an allowed rank (any rank when allowed_ranks is None). The returned
+        candidates list is unrestricted, so higher-rank hits are still visible to callers.
+        """
+        hit, scores = self._score(name)
+        candidates = self._top(hit, scores, top_k)
+        best = self._top(*self._rank_filter(hit, scores, allowed_ranks), 1) \
+            if allowed_ranks is not None else candidates[:1]
+        if not best or best[0]["confidence"] < min_confidence:
+            return None
+        top = best[0]
+        # the served model and the fallback profiles know species by common name, so a
+        # binomial hit ("Gadus morua") is reported as its common name ("cod") when indexed
+        common = self.common_name(str(top["scientificName"])) if top["rank"] != "common" else None
+        return SpeciesMatch(
+            name=common or str(top["name"]),
+            scientific_name=str(top["scientificName"]),
+            rank=str(top["rank"]),
+            confidence=float(top["confidence"]),
+            candidates=candidates,
+            matched_name=str(top["name"]),
+        )
+
+    def resolve_in_query(self, query: str, min_confidence: float = DEFAULT_MIN_CONFIDENCE,
+                         max_words: int = 3, top_k: int = 5,
+                         allowed_ranks: Optional[Iterable[str]] = PREDICTION_RANKS) -> Optional[SpeciesMatch]:
+        """
+        Find the best species mention in free text by scoring every 1..max_words word
+        window (stopwords and numbers skipped). Longer windows win ties, so
+        "bluefin tuna" beats "tuna". Only common-name/species matches are returned by
+        default, since the result is used as the predicted species.
+        """
+        words = [w for w in normalize_name(query).split() if w not in STOPWORDS and not w.isdigit()]
+        best: Optional[SpeciesMatch] = None
+        best_key = (-1.0, 0)
+        for size in range(1, max_words + 1):
+            for i in range(len(words) - size + 1):
+                window = " ".join(words[i:i + size])
+                if len(window) < 3:
+                    continue
+                match = self.best_match(window, min_confidence=min_confidence, top_k=top_k,
+                                        allowed_ranks=allowed_ranks)
+                if match is None:
+                    continue
+                key = (round(match.confidence, 3), size)
+                if key > best_key:
+                    best, best_key = match, key
+        return best
+
+    def _candidate(self, idx: int, score: float) -> Dict[str, object]:
+        return {
+            "name": str(self.labels[idx]),
+            "scientificName": str(self.scientific[idx]),
+            "rank": str(self.ranks[idx]),
+            "confidence": round(min(score, 1.0), 3),
+        }
+
+
+# ------------------ Entry sources ------------------
+def seed_entries(common_names: Dict[str, str]) -> List[Tuple[str, str, str, str]]:
+    """Entries for a {common name: scientific name} table (both names are indexed)."""
+    entries = [(common, common, sci, "common") for common, sci in common_names.items()]
+    entries += [(sci, sci, sci, "species") for sci in common_names.values()]
+    return entries
+
+
+def taxonomy_entries_from_csv(csv_path: str, chunksize: int = 200_000,
+                              encoding: str = "ISO-8859-1") -> List[Tuple[str, str, str, str]]:
+    """
+    Read the taxonomy columns of a cleaned occurrence CSV (streamed in chunks) and
+    return one entry per distinct taxon: every rank name plus "Genus epithet" binomials.
+    """
+    import pandas as pd
+
+    wanted = set(TAXONOMY_COLUMNS) | {"scientificName"}
+    seen = set()
+    entries: List[Tuple[str, str, str, str]] = []
+    for chunk in pd.read_csv(csv_path, usecols=lambda c: c in wanted, dtype=str, chunksize=chunksize,
+                             encoding=encoding, low_memory=False):
+        chunk = chunk.drop_duplicates()
+        for rec in chunk.to_dict("records"):
+            genus = rec.get("genus")
+            genus = genus.strip() if isinstance(genus, str) else ""
+            epithet = rec.get("specificEpithet")
+            epithet = epithet.strip() if isinstance(epithet, str) else ""
+            sci = rec.get("scientificName")
+            sci = sci.strip() if isinstance(sci, str) else ""
+            binomial = f"{genus} {epithet}".strip() if genus and epithet else ""
+            species_name = binomial or sci
+            if species_name:
+                for name in {species_name, sci} - {""}:
+                    if name not in seen:
+                        seen.add(name)
+                        entries.append((name, name, species_name, "species"))
+            for rank in ("genus", "family", "order", "class", "phylum", "kingdom"):
+                value = rec.get(rank)
+                if isinstance(value, str) and value.strip():
+                    key = f"{rank}:{value.strip()}"
+                    if key not in seen:
+                        seen.add(key)
+                        entries.append((value.strip(), value.strip(), value.strip(), rank))
+    logger.info("Collected %d taxonomy names from %s", len(entries), csv_path)
+    return entries
+
+
+def load_resolver(index_path: Optional[str] = None,
+                  seed: Optional[Dict[str, str]] = None) -> SpeciesResolver:
+    """
+    Load the on-disk index when present; otherwise build a small in-memory index
+    from the seed common-name table so the API keeps working without an index file.
+    """
+    if index_path and Path(index_path).exists():
+        try:
+            return SpeciesResolver.load(index_path)
+        except Exception as e:
+            logger.warning("Species index load failed for %s: %s", index_path, e)
+    return SpeciesResolver.build(seed_entries(seed or {}))
+
+
+# CLI runner
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 3 or sys.argv[1] not in ("build", "query"):
+        print("Usage:\n  python species_resolver.py build <cleaned.csv> <index.npz>\n"
+              "  python species_resolver.py query \"<name>\" [index.npz]")
+        sys.exit(1)
+
+    from predict_single import SPECIES_TO_SCIENTIFIC
+
+    if sys.argv[1] == "build":
+        if len(sys.argv) < 4:
+            print("Usage: python species_resolver.py build <cleaned.csv> <index.npz>")
+            sys.exit(1)
+        entries = seed_entries(SPECIES_TO_SCIENTIFIC) + taxonomy_entries_from_csv(sys.argv[2])
+        SpeciesResolver.build(entries).save(sys.argv[3])
+        return
+
+    index_path = sys.argv[3] if len(sys.argv) >= 4 else None
+    resolver = load_resolver(index_path, seed=SPECIES_TO_SCIENTIFIC)
+    print(json.dumps(resolver.resolve(sys.argv[2]), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+# telemetry.py
+"""
+Process resource telemetry for the API process.
+
+Collected on demand (GET /admin/telemetry) and by a background reporter that logs one
+summary line every OCEANAI_TELEMETRY_INTERVAL seconds:
+    - memory: RSS and peak RSS (/proc/self/status, falling back to resource.getrusage),
+      allocated Python blocks, and - when tracemalloc is enabled - traced bytes and the
+      top allocating source lines
+    - gc: per-generation collection counts plus pause times measured with gc.callbacks
+    - models: byte footprint of each registered model (computed once, cached) - the
+      pickled size for sklearn-style models; models containing an XGBoost booster report
+      the artifact file size instead, because serializing a booster makes a full temporary
+      copy of it (save_raw) in a process that may already be short of memory
+    - threads and worker pools: thread count/names, queue depth of registered pools and
+      busy/total threads of the anyio worker threadpool (run_in_threadpool)
+
+Everything except the tracemalloc snapshot is O(1)-ish and safe to leave on permanently.
+tracemalloc itself slows allocation down, so it is opt-in (OCEANAI_TRACEMALLOC=<frames>).
+
+Usage:
+    telemetry = ProcessTelemetry(tracemalloc_frames=0)
+    telemetry.register_model("primary", model, path)
+    telemetry.register_pool("audit_log", audit_log.utilization)
+    telemetry.start_reporter(60)
+    telemetry.snapshot(top_allocators=10)
+
+Usage (CLI):
+    python telemetry.py models/oceanai_model_v1.pkl
+"""
+
+from pathlib import Path
+import gc
+import os
+import sys
+import json
+import time
+import pickle
+import logging
+import threading
+import tracemalloc
+from typing import Optional, Dict, Any, Callable
+
+from shadow_eval import LatencyHistogram
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+logger = logging.getLogger("telemetry")
+logger.setLevel(logging.INFO)
+
+# GC pauses are usually well under a millisecond, so the buckets start lower than request latency
+GC_PAUSE_BUCKETS_MS = [0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, float("inf")]
+
+
+def read_memory() -> Dict[str, Optional[int]]:
+    """Current and peak resident set size in bytes."""
+    rss = peak = None
+    try:
+        with open("/proc/self/status") as fh:
+            for line in fh:
+                if line.startswith("VmRSS:"):
+                    rss = int(line.split()[1]) * 1024
+                elif line.startswith("VmHWM:"):
+                    peak = int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    if peak is None and resource is not None:
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # kilobytes on Linux, bytes on macOS
+        peak = maxrss if sys.platform == "darwin" else maxrss * 1024
+    return {"rss_bytes": rss, "peak_rss_bytes": peak}
+
+
+class _ByteCounter:
+    """File-like sink that only counts what pickle writes to it."""
+
+    def __init__(self):
+        self.n = 0
+
+    def write(self, data) -> int:
+        size = memoryview(data).nbytes
+        self.n += size
+        return size
+
+
+def _has_xgboost(obj) -> bool:
+    steps = [step for _, step in obj.steps] if hasattr(obj, "steps") else [obj]
+    return any(type(step).__module__.split(".")[0] == "xgboost" for step in steps)
+
+
+def anyio_threadpool_probe():
+    """
+    Probe of the default anyio thread limiter used by run_in_threadpool. Must be created
+    on the event loop (e.g. in a startup hook); the returned callable is thread-safe.
+    """
+    import anyio.to_thread
+
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    return lambda: {"busy_threads": int(limiter.borrowed_tokens), "total_threads": int(limiter.total_tokens),
+                    "waiting": int(limiter.statistics().tasks_waiting)}
+
+
+def model_footprint(obj) -> int:
+    """Serialized size of a model in bytes (pickled into a counting sink, no buffer kept)."""
+    sink = _ByteCounter()
+    pickle.dump(obj, sink, protocol=pickle.HIGHEST_PROTOCOL)
+    return sink.n
+
+
+class GCPauseMonitor:
+    """
+    Times every collection through gc.callbacks. The callback runs inside the collector,
+    so it only does arithmetic - no locks (a collection can start while stats() is running
+    on the same thread) and no allocation-heavy work.
+    """
+
+    def __init__(self):
+        self.pauses = [LatencyHistogram(GC_PAUSE_BUCKETS_MS) for _ in range(3)]
+        self.max_pause_ms = [0.0, 0.0, 0.0]
+        self._started = 0.0
+        self._installed = False
+
+    def _callback(self, phase: str, info: Dict[str, Any]):
+        if phase == "start":
+            self._started = time.perf_counter()
+            return
+        ms = (time.perf_counter() - self._started) * 1000
+        gen = info.get("generation", 0)
+        self.pauses[gen].observe(ms)
+        if ms > self.max_pause_ms[gen]:
+            self.max_pause_ms[gen] = ms
+
+    def install(self):
+        if not self._installed:
+            gc.callbacks.append(self._callback)
+            self._installed = True
+
+    def uninstall(self):
+        if self._installed:
+            gc.callbacks.remove(self._callback)
+            self._installed = False
+
+    def total_pause_ms(self) -> float:
+        return sum(h.total_ms for h in self.pauses)
+
+    def to_dict(self) -> Dict[str, Any]:
+        stats = gc.get_stats()
+        return {
+            "enabled": gc.isenabled(),
+            "thresholds": list(gc.get_threshold()),
+            "pending": list(gc.get_count()),
+            "total_pause_ms": round(self.total_pause_ms(), 3),
+            "generations": [
+                {
+                    "generation": gen,
+                    "collections": stats[gen]["collections"],
+                    "collected": stats[gen]["collected"],
+                    "uncollectable": stats[gen]["uncollectable"],
+                    "max_pause_ms": round(self.max_pause_ms[gen], 3),
+                    "pause": self.pauses[gen].to_dict(),
+                }
+                for gen in range(3)
+            ],
+        }
+
+
+class ProcessTelemetry:
+    """Aggregates memory, GC, model and pool statistics for the current process."""
+
+    def __init__(self, tracemalloc_frames: int = 0):
+        self.started_at = time.time()
+        self.gc = GCPauseMonitor()
+        self.gc.install()
+        self._models: Dict[str, Dict[str, Any]] = {}
+        self._pools: Dict[str, Callable[[], Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._footprint_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._reporter: Optional[threading.Thread] = None
+        if tracemalloc_frames > 0 and not tracemalloc.is_tracing():
+            tracemalloc.start(tracemalloc_frames)
+            logger.info("tracemalloc enabled (%d frames)", tracemalloc_frames)
+
+    # ------------------ Registration ------------------
+    def register_model(self, name: str, obj, path: Optional[Path] = None):
+        """Track a loaded model; its footprint is measured on first use and then cached."""
+        with self._lock:
+            self._models[name] = {"obj": obj, "path": str(path) if path else None,
+                                  "type": type(obj).__name__, "footprint": None}
+
+    def register_pool(self, name: str, probe: Callable[[], Dict[str, Any]]):
+        """probe() must be cheap: it is called on every snapshot and report line."""
+        with self._lock:
+            self._pools[name] = probe
+
+    @staticmethod
+    def _measure(entry: Dict[str, Any]) -> Dict[str, Any]:
+        footprint: Dict[str, Any] = {}
+        if entry["path"] and Path(entry["path"]).exists():
+            footprint["file_bytes"] = Path(entry["path"]).stat().st_size
+        if _has_xgboost(entry["obj"]):
+            # pickling would copy the whole booster; the artifact size is the estimate
+            footprint["method"] = "file"
+            return footprint
+        try:
+            footprint["serialized_bytes"] = model_footprint(entry["obj"])
+            footprint["method"] = "pickle"
+        except Exception as e:
+            footprint["error"] = str(e)
+        return footprint
+
+    def _model_stats(self) -> Dict[str, Any]:
+        out = {}
+        with self._lock:
+            entries = list(self._models.items())
+        for name, entry in entries:
+            if entry["footprint"] is None:
+                with self._footprint_lock:
+                    if entry["footprint"] is None:
+                        entry["footprint"] = self._measure(entry)
+                        # the footprint is all we need from here on
+                        entry["obj"] = None
+            out[name] = {"type": entry["type"], "path": entry["path"], **entry["footprint"]}
+        return out
+
+    def _pool_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            probes = list(self._pools.items())
+        out = {}
+        for name, probe in probes:
+            try:
+                out[name] = probe()
+            except Exception as e:
+                out[name] = {"error": str(e)}
+        return out
+
+    # ------------------ Reporting ------------------
+    def snapshot(self, top_allocators: int = 0) -> Dict[str, Any]:
+        memory: Dict[str, Any] = {**read_memory(), "python_allocated_blocks": sys.getallocatedblocks()}
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            memory["tracemalloc"] = {"traced_bytes": current, "peak_traced_bytes": peak}
+            if top_allocators > 0:
+                stats = tracemalloc.take_snapshot().statistics("lineno")[:top_allocators]
+                memory["tracemalloc"]["top_allocators"] = [
+                    {"location": str(s.traceback[0]), "bytes": s.size, "blocks": s.count} for s in stats
+                ]
+        else:
+            memory["tracemalloc"] = None
+
+        threads = threading.enumerate()
+        return {
+            "pid": os.getpid(),
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "memory": memory,
+            "gc": self.gc.to_dict(),
+            "models": self._model_stats(),
+            "threads": {"count": len(threads), "names": sorted(t.name for t in threads)},
+            "pools": self._pool_stats(),
+        }
+
+    def summary_line(self) -> str:
+        mem = read_memory()
+        stats = gc.get_stats()
+        parts = [
+            f"rss_mb={mem['rss_bytes'] / 2**20:.1f}" if mem["rss_bytes"] else "rss_mb=?",
+            f"peak_rss_mb={mem['peak_rss_bytes'] / 2**20:.1f}" if mem["peak_rss_bytes"] else "peak_rss_mb=?",
+            "gc_collections=" + "/".join(str(s["collections"]) for s in stats),
+            f"gc_pause_ms={self.gc.total_pause_ms():.1f}",
+            f"threads={threading.active_count()}",
+        ]
+        if tracemalloc.is_tracing():
+            parts.append(f"traced_mb={tracemalloc.get_traced_memory()[0] / 2**20:.1f}")
+        for name, stats_ in self._pool_stats().items():
+            if "queue_depth" in stats_:
+                parts.append(f"{name}_queue={stats_['queue_depth']}")
+            if "busy_threads" in stats_:
+                parts.append(f"{name}_busy={stats_['busy_threads']}/{stats_['total_threads']}")
+        return " ".join(parts)
+
+    def start_reporter(self, interval: float):
+        """Log summary_line() every `interval` seconds on a daemon thread (<= 0 disables)."""
+        if interval <= 0 or self._reporter is not None:
+            return
+
+        def run():
+            while not self._stop.wait(interval):
+                try:
+                    logger.info("telemetry %s", self.summary_line())
+                except Exception as e:
+                    logger.warning("Telemetry report failed: %s", e)
+
+        self._reporter = threading.Thread(target=run, name="telemetry", daemon=True)
+        self._reporter.start()
+
+    def close(self):
+        self._stop.set()
+        if self._reporter is not None:
+            self._reporter.join(timeout=1.0)
+        self.gc.uninstall()
+
+
+# CLI runner
+def main():
+    logging.basicConfig(level=logging.INFO)
+    if len(sys.argv) < 2:
+        print("Usage: python telemetry.py <model.pkl>")
+        sys.exit(1)
+    from predict_single import safe_load_model
+
+    before = read_memory()["rss_bytes"]
+    model_obj, _ = safe_load_model(Path(sys.argv[1]))
+    after = read_memory()["rss_bytes"]
+    telemetry = ProcessTelemetry()
+    telemetry.register_model("model", model_obj, Path(sys.argv[1]))
+    report = telemetry.snapshot()["models"]["model"]
+    if before is not None and after is not None:
+        report["rss_delta_bytes"] = after - before
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,648 @@
+# train_model.py
+"""
+Training utilities for the OceanAI occurrence model (ported from Filtered_data_model1.ipynb).
+
+- clean_occurrences(): the notebook's cleaning steps as a reusable function.
+- prepare_training_data(): cleaned + encoded feature matrix, cached on disk keyed by a hash
+  of the input file and the preparation config.
+- train_full(): optional hyperparameter search with cross-validation folds spread over a
+  process pool, then fit the best XGBoost pipeline and save a versioned artifact.
+- update_incremental(): continue boosting an existing artifact on a batch of new rows only,
+  reusing its fitted encoders and cached encoded feature matrices from earlier runs.
+
+Artifacts are dicts saved with joblib that ModelValidator already understands:
+    {"pipeline": sklearn Pipeline, "features": [...], "label_encoder": LabelEncoder,
+     "version": int, "parent_version": int | None, "encoder_id": str,
+     "feature_batches": [cache keys], "metrics": {...}, "training_seconds": float, ...}
+Each artifact gets a sibling <name>.drift.json reference sketch used by drift_monitor.
+Artifacts are named occurrence_model_v<N>.pkl - a prefix of their own, so they never
+shadow or get confused with the served oceanai_model_v1.pkl - and the version is always
+the one in the file name; saving over a version that already exists is refused.
+
+Note: these artifacts are species-occurrence classifiers. The pipeline predicts
+label-encoded scientificName codes (decode with artifact["label_encoder"]) from the
+occurrence FEATURES below, whereas main.py / predict_single build stock-status feature
+rows and read integer classes as {0: Declining, 1: Stable, 2: Increasing}. They are not
+yet servable by /predict; use them through the artifact dict (or /predict/batch with
+occurrence columns and the label encoder on the client side).
+
+Usage (CLI):
+    python train_model.py train fish_data_cleaned_final.csv --search --n-iter 20 --folds 3
+    python train_model.py update new_survey_batch.csv --base models/occurrence_model_v2.pkl
+    python train_model.py synthetic /tmp/occurrences.csv --rows 2000   # small test dataset
+"""
+
+from pathlib import Path
+import sys
+import os
+import time
+import json
+import shutil
+import hashlib
+import logging
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Optional, Dict, Any, List, Tuple
+
+import numpy as np
+import pandas as pd
+import joblib
+import xgboost as xgb
+from sklearn.compose import ColumnTransformer
+from sklearn.metrics import accuracy_score, f1_score, log_loss
+from sklearn.model_selection import KFold, ParameterSampler, StratifiedKFold, train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import LabelEncoder, OrdinalEncoder
+
+from validate_model import ModelValidator
+from drift_monitor import FeatureDriftMonitor
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger("train_model")
+
+MODEL_DIR = Path(__file__).parent / "models"
+FEATURE_CACHE_DIR = MODEL_DIR / "feature_cache"
+# distinct from the served oceanai_model_v*.pkl stock-status models
+ARTIFACT_PREFIX = "occurrence_model_v"
+# bump when clean_occurrences / build_preprocessor change so old caches are not reused
+PREP_VERSION = 2
+
+NUMERIC_COLS = [
+    "decimalLatitude",
+    "decimalLongitude",
+    "minimumDepthInMeters",
+    "maximumDepthInMeters",
+]
+CATEGORICAL_COLS = ["waterBody", "country", "sex", "lifeStage"]
+FEATURES = NUMERIC_COLS + CATEGORICAL_COLS
+TARGET = "scientificName"
+
+DEFAULT_XGB_PARAMS = {
+    "n_estimators": 200,
+    "learning_rate": 0.1,
+    "max_depth": 6,
+    "random_state": 42,
+    "eval_metric": "mlogloss",
+    "tree_method": "hist",
+}
+
+DEFAULT_SEARCH_SPACE = {
+    "n_estimators": [100, 200, 400],
+    "learning_rate": [0.05, 0.1, 0.2],
+    "max_depth": [4, 6, 8],
+    "subsample": [0.8, 1.0],
+    "colsample_bytree": [0.8, 1.0],
+    "min_child_weight": [1, 5],
+}
+
+
+# ------------------ Data preparation ------------------
+def read_occurrences(csv_path: str, encoding: str = "ISO-8859-1") -> pd.DataFrame:
+    return pd.read_csv(csv_path, encoding=encoding, low_memory=False)
+
+
+def clean_occurrences(df: pd.DataFrame) -> pd.DataFrame:
+    """Apply the notebook's cleaning steps; columns that are absent are skipped."""
+    df = df.replace("Unknown", np.nan)
+
+    if "individualCount" in df:
+        counts = pd.to_numeric(df["individualCount"], errors="coerce")
+        counts = counts.where(counts >= 0).fillna(0)
+        df["individualCount"] = counts.where(counts <= 100)
+    if "eventDate" in df:
+        df["eventDate"] = pd.to_datetime(df["eventDate"], errors="coerce")
+
+    for col in NUMERIC_COLS:
+        if col in df:
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+
+    df = df.dropna(subset=[TARGET, "decimalLatitude", "decimalLongitude"])
+    df = df[df["decimalLatitude"].between(-90, 90) & df["decimalLongitude"].between(-180, 180)]
+
+    for col in ("minimumDepthInMeters", "maximumDepthInMeters"):
+        if col in df:
+            df.loc[df[col] < 0, col] = np.nan
+    if "minimumDepthInMeters" in df and "maximumDepthInMeters" in df:
+        swap = df["minimumDepthInMeters"] > df["maximumDepthInMeters"]
+        df.loc[swap, ["minimumDepthInMeters", "maximumDepthInMeters"]] = \
+            df.loc[swap, ["maximumDepthInMeters", "minimumDepthInMeters"]].values
+
+    for col in CATEGORICAL_COLS:
+        df[col] = df[col].fillna("Unknown").astype(str) if col in df else "Unknown"
+    for col in NUMERIC_COLS:
+        if col not in df:
+            df[col] = np.nan
+    df[TARGET] = df[TARGET].astype(str)
+    return df.reset_index(drop=True)
+
+
+def build_preprocessor() -> ColumnTransformer:
+    return ColumnTransformer(
+        [
+            ("num", "passthrough", NUMERIC_COLS),
+            ("cat", OrdinalEncoder(handle_unknown="use_encoded_value", unknown_value=-1,
+                                   dtype=np.float32), CATEGORICAL_COLS),
+        ],
+        verbose_feature_names_out=False,
+    )
+
+
+def build_classifier(params: Optional[Dict[str, Any]] = None) -> xgb.XGBClassifier:
+    return xgb.XGBClassifier(**{**DEFAULT_XGB_PARAMS, **(params or {})})
+
+
+# ------------------ Feature cache ------------------
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def load_cache_meta(key: str, cache_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """meta.json of a cache entry ({} for entries written without one)."""
+    path = Path(cache_dir or FEATURE_CACHE_DIR) / key / "meta.json"
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def load_cached_features(key: str, cache_dir: Optional[Path] = None,
+                         mmap: bool = False) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    path = Path(cache_dir or FEATURE_CACHE_DIR) / key
+    if not (path / "y.npy").exists():
+        return None
+    mode = "r" if mmap else None
+    return np.load(path / "X.npy", mmap_mode=mode), np.load(path / "y.npy", mmap_mode=mode)
+
+
+def save_cached_features(key: str, X: np.ndarray, y: np.ndarray, encoders: Optional[Dict[str, Any]] = None,
+                         cache_dir: Optional[Path] = None, meta: Optional[Dict[str, Any]] = None) -> Path:
+    """Write X.npy / y.npy (+ encoders.joblib, meta.json) into a cache entry directory, atomically."""
+    root = Path(cache_dir or FEATURE_CACHE_DIR)
+    path = root / key
+    tmp = root / f".{key}.{os.getpid()}.tmp"
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "X.npy", np.ascontiguousarray(X, dtype=np.float32))
+    np.save(tmp / "y.npy", np.ascontiguousarray(y, dtype=np.int32))
+    if encoders is not None:
+        joblib.dump(encoders, tmp / "encoders.joblib")
+    if meta is not None:
+        (tmp / "meta.json").write_text(json.dumps(meta))
+    shutil.rmtree(path, ignore_errors=True)
+    tmp.replace(path)
+    return path
+
+
+def _load_training_frame(csv_path: str, min_class_count: int, encoding: str) -> pd.DataFrame:
+    df = clean_occurrences(read_occurrences(csv_path, encoding=encoding))
+    counts = df[TARGET].value_counts()
+    return df[df[TARGET].isin(counts[counts >= min_class_count].index)]
+
+
+def save_drift_reference(df: pd.DataFrame, path: Path) -> Path:
+    """Reference sketch of the raw model inputs, for drift monitoring in the service."""
+    reference = FeatureDriftMonitor.from_frame_schema(df[FEATURES])
+    reference.update_frame(df[FEATURES])
+    return reference.save(path)
+
+
+def prepare_training_data(csv_path: str, min_class_count: int = 2, encoding: str = "ISO-8859-1",
+                          cache_dir: Optional[Path] = None, refresh: bool = False) -> Dict[str, Any]:
+    """
+    Clean, filter and encode a full occurrence CSV, reusing the on-disk cache when the file
+    content and preparation config are unchanged.
+    Returns {"key", "X", "y", "preprocessor", "label_encoder", "cache_hit"}; the cache entry
+    also holds drift_reference.json, a drift_monitor sketch of the raw feature columns.
+    """
+    config = {"prep_version": PREP_VERSION, "features": FEATURES, "target": TARGET,
+              "min_class_count": min_class_count, "encoding": encoding}
+    key = hashlib.sha256(
+        (file_digest(csv_path) + json.dumps(config, sort_keys=True)).encode()
+    ).hexdigest()[:32]
+    cache_dir = Path(cache_dir or FEATURE_CACHE_DIR)
+
+    cached = None if refresh else load_cached_features(key, cache_dir, mmap=True)
+    if cached is not None and (cache_dir / key / "encoders.joblib").exists():
+        encoders = joblib.load(cache_dir / key / "encoders.joblib")
+        logger.info("Feature cache hit %s (%d rows)", key, len(cached[1]))
+        if not (cache_dir / key / "drift_reference.json").exists():
+            logger.info("Cache entry %s has no drift reference; rebuilding it", key)
+            df = _load_training_frame(csv_path, min_class_count, encoding)
+            save_drift_reference(df, cache_dir / key / "drift_reference.json")
+        return {"key": key, "X": cached[0], "y": cached[1], "cache_hit": True, **encoders}
+
+    df = _load_training_frame(csv_path, min_class_count, encoding)
+
+    label_encoder = LabelEncoder().fit(df[TARGET])
+    y = label_encoder.transform(df[TARGET]).astype(np.int32)
+    preprocessor = build_preprocessor().fit(df[FEATURES])
+    X = np.asarray(preprocessor.transform(df[FEATURES]), dtype=np.float32)
+
+    encoders = {"preprocessor": preprocessor, "label_encoder": label_encoder}
+    save_cached_features(key, X, y, encoders=encoders, cache_dir=cache_dir)
+    save_drift_reference(df, cache_dir / key / "drift_reference.json")
+    logger.info("Feature cache miss %s: encoded %d rows", key, len(y))
+    return {"key": key, "X": X, "y": y, "cache_hit": False, **encoders}
+
+
+def make_synthetic_occurrences(path: str, n_rows: int = 2000, n_species: int = 5, seed: int = 0) -> Path:
+    """Write a small occurrence CSV with the notebook's columns (for tests and smoke runs)."""
+    rng = np.random.default_rng(seed)
+    species = np.array([f"Species{chr(65 + i)} synthetica" for i in range(n_species)])
+    centers = rng.uniform([-60, -170], [60, 170], size=(n_species, 2))
+    idx = rng.integers(0, n_species, n_rows)
+    min_depth = rng.uniform(0, 200, n_rows)
+    df = pd.DataFrame({
+        "occurrenceID": np.arange(n_rows),
+        "eventDate": pd.Timestamp("2020-01-01") + pd.to_timedelta(rng.integers(0, 1500, n_rows), unit="D"),
+        "individualCount": rng.integers(-2, 120, n_rows),
+        "sex": rng.choice(["male", "female", "Unknown"], n_rows),
+        "lifeStage": rng.choice(["adult", "juvenile", "Unknown"], n_rows),
+        "waterBody": np.array(["Pacific", "Atlantic", "Indian Ocean", "North Sea"])[idx % 4],
+        "country": rng.choice(["US", "NO", "IN", "AU"], n_rows),
+        "stateProvince": "Unknown",
+        "decimalLatitude": centers[idx, 0] + rng.normal(0, 4, n_rows),
+        "decimalLongitude": centers[idx, 1] + rng.normal(0, 6, n_rows),
+        "minimumDepthInMeters": min_depth,
+        "maximumDepthInMeters": min_depth + rng.uniform(-20, 100, n_rows),
+        "scientificName": species[idx],
+    })
+    path = Path(path)
+    df.to_csv(path, index=False)
+    return path
+
+
+# ------------------ Hyperparameter search ------------------
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_search_worker(cache_path: str, train_index: np.ndarray, n_folds: int, n_classes: int):
+    """
+    Process-pool initializer: memory-map the cached matrix once per worker. X stays a
+    memmap; each task reads only the rows of its fold (see _fold_rows), so workers share
+    the page cache instead of holding private copies of the training matrix.
+    """
+    X = np.load(Path(cache_path) / "X.npy", mmap_mode="r")
+    y = np.asarray(np.load(Path(cache_path) / "y.npy", mmap_mode="r"))
+    train_index = np.asarray(train_index)
+    y_train = y[train_index]
+    folds = _fold_splitter(y_train, n_folds).split(np.zeros((len(y_train), 1)), y_train)
+    _worker_state.update(X=X, y=y, n_classes=n_classes,
+                         folds=[(train_index[tr], train_index[va]) for tr, va in folds])
+
+
+def _fold_rows(rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Read the given rows of the memory-mapped matrix (sorted, for sequential access)."""
+    rows = np.sort(rows)
+    return np.asarray(_worker_state["X"][rows]), _worker_state["y"][rows]
+
+
+def _fold_splitter(y: np.ndarray, n_folds: int):
+    if np.bincount(y).min(initial=n_folds) >= n_folds:
+        return StratifiedKFold(n_splits=n_folds, shuffle=True, random_state=42)
+    return KFold(n_splits=n_folds, shuffle=True, random_state=42)
+
+
+def _to_train_params(params: Dict[str, Any], n_classes: int) -> Tuple[Dict[str, Any], int]:
+    merged = {**DEFAULT_XGB_PARAMS, **params}
+    rounds = int(merged.pop("n_estimators"))
+    merged["seed"] = merged.pop("random_state")
+    merged.update({"objective": "multi:softprob", "num_class": n_classes, "nthread": 1})
+    return merged, rounds
+
+
+def _score_fold(task: Tuple[int, Dict[str, Any], int]) -> Dict[str, Any]:
+    candidate, params, fold = task
+    n_classes = _worker_state["n_classes"]
+    train_rows, val_rows = _worker_state["folds"][fold]
+    train_params, rounds = _to_train_params(params, n_classes)
+    started = time.perf_counter()
+    X_fit, y_fit = _fold_rows(train_rows)
+    booster = xgb.train(train_params, xgb.DMatrix(X_fit, label=y_fit), num_boost_round=rounds)
+    del X_fit
+    X_val, y_val = _fold_rows(val_rows)
+    proba = booster.predict(xgb.DMatrix(X_val))
+    return {
+        "candidate": candidate,
+        "fold": fold,
+        "log_loss": float(log_loss(y_val, proba, labels=np.arange(n_classes))),
+        "accuracy": float(accuracy_score(y_val, proba.argmax(axis=1))),
+        "seconds": time.perf_counter() - started,
+    }
+
+
+def hyperparameter_search(cache_path: Path, train_index: np.ndarray, n_classes: int,
+                          space: Optional[Dict[str, list]] = None, n_iter: int = 12,
+                          n_folds: int = 3, workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Score n_iter sampled parameter sets with n_folds-fold CV. Every (candidate, fold) fit is a
+    separate task on a process pool (default: one worker per core, single-threaded XGBoost).
+    Returns candidates sorted by mean validation log loss (best first).
+    """
+    candidates = list(ParameterSampler(space or DEFAULT_SEARCH_SPACE, n_iter=n_iter, random_state=42))
+    tasks = [(i, params, fold) for i, params in enumerate(candidates) for fold in range(n_folds)]
+    workers = workers or os.cpu_count() or 1
+    initargs = (str(cache_path), np.asarray(train_index), n_folds, n_classes)
+    logger.info("Hyperparameter search: %d candidates x %d folds on %d workers",
+                len(candidates), n_folds, workers)
+
+    if workers == 1:
+        _init_search_worker(*initargs)
+        fold_results = [_score_fold(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_search_worker,
+                                 initargs=initargs) as pool:
+            fold_results = list(pool.map(_score_fold, tasks))
+
+    results = []
+    for i, params in enumerate(candidates):
+        folds = [r for r in fold_results if r["candidate"] == i]
+        results.append({
+            "params": params,
+            "mean_log_loss": float(np.mean([r["log_loss"] for r in folds])),
+            "mean_accuracy": float(np.mean([r["accuracy"] for r in folds])),
+            "fit_seconds": round(float(sum(r["seconds"] for r in folds)), 3),
+        })
+    results.sort(key=lambda r: r["mean_log_loss"])
+    return results
+
+
+# ------------------ Artifacts ------------------
+def artifact_version(path: Path) -> Optional[int]:
+    """Version encoded in an artifact file name (occurrence_model_v3.pkl -> 3), else None."""
+    stem = Path(path).stem
+    if not stem.startswith(ARTIFACT_PREFIX):
+        return None
+    try:
+        return int(stem[len(ARTIFACT_PREFIX):])
+    except ValueError:
+        return None
+
+
+def next_artifact_path(model_dir: Path = MODEL_DIR) -> Tuple[Path, int]:
+    versions = [v for v in (artifact_version(p) for p in model_dir.glob(f"{ARTIFACT_PREFIX}*.pkl")) if v is not None]
+    version = max(versions, default=0) + 1
+    return model_dir / f"{ARTIFACT_PREFIX}{version}.pkl", version
+
+
+def save_artifact(artifact: Dict[str, Any], path: Optional[Path] = None) -> Path:
+    """
+    The version is the one in the file name: the next free one of MODEL_DIR by default, or
+    the one of an explicit occurrence_model_v<N>.pkl output. Existing files are never
+    overwritten, so two updates of the same base cannot both claim the same version.
+    """
+    if path is None:
+        path, artifact["version"] = next_artifact_path()
+    else:
+        path = Path(path)
+        artifact["version"] = artifact_version(path)
+        if artifact["version"] is None:
+            raise ValueError(f"--output must be named {ARTIFACT_PREFIX}<version>.pkl, got {path.name}")
+    if path.exists():
+        raise FileExistsError(f"{path} already exists; version {artifact['version']} is taken")
+    path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(artifact, path)
+    # make sure the service loader can read what we just wrote
+    ModelValidator(str(path))
+    logger.info("Saved artifact v%s to %s", artifact.get("version"), path)
+    return path
+
+
+def drift_reference_path(artifact_path: Path) -> Path:
+    """Reference drift sketch stored next to an artifact (occurrence_model_v3.drift.json)."""
+    return artifact_path.with_suffix(".drift.json")
+
+
+def evaluate(classifier, X: np.ndarray, y: np.ndarray, n_classes: int) -> Dict[str, float]:
+    if len(y) == 0:
+        return {}
+    proba = classifier.predict_proba(X)
+    pred = proba.argmax(axis=1)
+    return {
+        "accuracy": float(accuracy_score(y, pred)),
+        "f1_macro": float(f1_score(y, pred, average="macro")),
+        "log_loss": float(log_loss(y, proba, labels=np.arange(n_classes))),
+        "n_eval": int(len(y)),
+    }
+
+
+# ------------------ Full training ------------------
+def train_full(csv_path: str, params: Optional[Dict[str, Any]] = None,
+               output: Optional[Path] = None, test_size: float = 0.2,
+               search: bool = False, n_iter: int = 12, n_folds: int = 3,
+               workers: Optional[int] = None, cache_dir: Optional[Path] = None,
+               refresh_cache: bool = False) -> Tuple[Path, Dict[str, Any]]:
+    """
+    Train from scratch on a cleaned occurrence CSV (notebook equivalent). With search=True
+    the XGBoost parameters come from hyperparameter_search() on the training split.
+    """
+    started = time.perf_counter()
+    data = prepare_training_data(csv_path, cache_dir=cache_dir, refresh=refresh_cache)
+    X, y = data["X"], data["y"]
+    label_encoder: LabelEncoder = data["label_encoder"]
+    n_classes = len(label_encoder.classes_)
+
+    train_index, test_index = train_test_split(
+        np.arange(len(y)), test_size=test_size, random_state=42, stratify=y
+    )
+
+    search_results = None
+    if search:
+        cache_path = Path(cache_dir or FEATURE_CACHE_DIR) / data["key"]
+        search_results = hyperparameter_search(cache_path, train_index, n_classes, n_iter=n_iter,
+                                               n_folds=n_folds, workers=workers)
+        params = {**search_results[0]["params"], **(params or {})}
+        logger.info("Best parameters: %s (cv log loss %.4f)", params, search_results[0]["mean_log_loss"])
+
+    X_train, y_train = np.asarray(X[train_index]), np.asarray(y[train_index])
+    classifier = build_classifier(params).fit(X_train, y_train)
+
+    artifact = {
+        "pipeline": Pipeline([("preprocessor", data["preprocessor"]), ("classifier", classifier)]),
+        "features": FEATURES,
+        "target": TARGET,
+        "label_encoder": label_encoder,
+        "version": None,
+        "parent_version": None,
+        "encoder_id": data["key"],
+        "feature_batches": [data["key"]],
+        "params": {**DEFAULT_XGB_PARAMS, **(params or {})},
+        "search": search_results,
+        "metrics": evaluate(classifier, np.asarray(X[test_index]), np.asarray(y[test_index]), n_classes),
+        "n_train_rows": int(len(y_train)),
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "training_seconds": round(time.perf_counter() - started, 3),
+    }
+    path = save_artifact(artifact, output)
+    reference = Path(cache_dir or FEATURE_CACHE_DIR) / data["key"] / "drift_reference.json"
+    if reference.exists():
+        shutil.copyfile(reference, drift_reference_path(path))
+    return path, artifact
+
+
+# ------------------ Incremental training ------------------
+def update_incremental(base_path: str, new_csv: str, rounds: int = 50,
+                       replay_ratio: float = 0.5, holdout: float = 0.2,
+                       output: Optional[Path] = None,
+                       cache_dir: Optional[Path] = None) -> Tuple[Path, Dict[str, Any]]:
+    """
+    Add `rounds` boosting rounds to the base artifact using only the rows in `new_csv`.
+
+    The base artifact's fitted encoders are reused as-is (unseen categories encode to -1),
+    so encoded matrices cached by earlier runs stay valid; a sample of them (replay_ratio x
+    new rows) is mixed into training to limit forgetting. Rows whose species is unknown to
+    the base label encoder cannot be added by boosting and are reported, not trained on.
+    Returns (artifact_path, report).
+    """
+    started = time.perf_counter()
+    base = joblib.load(base_path)
+    if not isinstance(base, dict) or "label_encoder" not in base or "encoder_id" not in base:
+        raise ValueError(f"{base_path} is not a train_model artifact; run a full training first")
+
+    pipeline: Pipeline = base["pipeline"]
+    preprocessor = pipeline.named_steps["preprocessor"]
+    base_clf: xgb.XGBClassifier = pipeline.named_steps["classifier"]
+    label_encoder: LabelEncoder = base["label_encoder"]
+    n_classes = len(label_encoder.classes_)
+
+    # encode the new batch with the existing encoders (cached by content + encoder id)
+    batch_key = f"{base['encoder_id']}-{file_digest(new_csv)[:16]}"
+    cached = load_cached_features(batch_key, cache_dir)
+    n_unknown_species = 0
+    if cached is not None:
+        X_new, y_new = cached
+        # rows dropped when the batch was first encoded are not in the cached matrix
+        n_unknown_species = int(load_cache_meta(batch_key, cache_dir).get("skipped_unknown_species", 0))
+        logger.info("Reusing cached features for batch %s", batch_key)
+    else:
+        df = clean_occurrences(read_occurrences(new_csv))
+        known = df[TARGET].isin(label_encoder.classes_)
+        n_unknown_species = int((~known).sum())
+        df = df[known]
+        X_new = np.asarray(preprocessor.transform(df[FEATURES]), dtype=np.float32)
+        y_new = label_encoder.transform(df[TARGET]).astype(np.int32)
+        save_cached_features(batch_key, X_new, y_new, cache_dir=cache_dir,
+                             meta={"skipped_unknown_species": n_unknown_species})
+    if len(y_new) < 2:
+        raise ValueError("New batch has fewer than 2 usable rows after cleaning")
+
+    X_fit, X_eval, y_fit, y_eval = train_test_split(X_new, y_new, test_size=holdout, random_state=42)
+
+    # replay a sample of previously cached batches
+    replay_X, replay_y = [], []
+    budget = int(len(y_fit) * replay_ratio)
+    rng = np.random.default_rng(42)
+    for key in base.get("feature_batches", []):
+        if budget <= 0 or key == batch_key:
+            continue
+        prev = load_cached_features(key, cache_dir, mmap=True)
+        if prev is None:
+            continue
+        take = rng.choice(len(prev[1]), size=min(budget, len(prev[1])), replace=False)
+        replay_X.append(prev[0][take])
+        replay_y.append(prev[1][take])
+        budget -= len(take)
+    if replay_X:
+        X_fit = np.vstack([X_fit] + replay_X)
+        y_fit = np.concatenate([y_fit] + replay_y)
+
+    # continue boosting from the base booster; xgb.train copies it, the base stays untouched
+    params = {k: v for k, v in base_clf.get_xgb_params().items() if v is not None}
+    params.update({"objective": "multi:softprob", "num_class": n_classes})
+    booster = xgb.train(params, xgb.DMatrix(X_fit, label=y_fit), num_boost_round=rounds,
+                        xgb_model=base_clf.get_booster())
+    classifier = xgb.XGBClassifier(**base_clf.get_params())
+    classifier.load_model(bytearray(booster.save_raw("ubj")))
+    classifier.set_params(n_estimators=booster.num_boosted_rounds())
+
+    previous_metrics = evaluate(base_clf, X_eval, y_eval, n_classes)
+    current_metrics = evaluate(classifier, X_eval, y_eval, n_classes)
+    training_seconds = round(time.perf_counter() - started, 3)
+
+    artifact = {
+        **base,
+        "pipeline": Pipeline([("preprocessor", preprocessor), ("classifier", classifier)]),
+        "version": None,
+        "parent_version": base.get("version"),
+        "feature_batches": list(base.get("feature_batches", [])) + [batch_key],
+        "metrics": current_metrics,
+        "n_train_rows": int(base.get("n_train_rows", 0)) + int(len(y_new) - len(y_eval)),
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "training_seconds": training_seconds,
+    }
+    path = save_artifact(artifact, output)
+    # encoders are unchanged, so the parent's training reference still applies
+    if drift_reference_path(Path(base_path)).exists():
+        shutil.copyfile(drift_reference_path(Path(base_path)), drift_reference_path(path))
+
+    report = {
+        "artifact": str(path),
+        "version": artifact["version"],
+        "parent_version": artifact["parent_version"],
+        "training_seconds": training_seconds,
+        "new_rows": int(len(y_new)),
+        "replay_rows": int(sum(len(r) for r in replay_y)),
+        "skipped_unknown_species": n_unknown_species,
+        "boosting_rounds": booster.num_boosted_rounds(),
+        "metrics": {
+            "previous": previous_metrics,
+            "current": current_metrics,
+            "delta": {k: round(current_metrics[k] - previous_metrics[k], 6)
+                      for k in current_metrics if k != "n_eval" and k in previous_metrics},
+        },
+    }
+    return path, report
+
+
+# CLI runner
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Train or update the OceanAI occurrence model")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_train = sub.add_parser("train", help="train from scratch on a cleaned occurrence CSV")
+    p_train.add_argument("csv")
+    p_train.add_argument("--output", type=Path, default=None)
+    p_train.add_argument("--search", action="store_true", help="run hyperparameter search first")
+    p_train.add_argument("--n-iter", type=int, default=12, help="parameter sets to try")
+    p_train.add_argument("--folds", type=int, default=3)
+    p_train.add_argument("--workers", type=int, default=None, help="process pool size (default: all cores)")
+    p_train.add_argument("--cache-dir", type=Path, default=None)
+    p_train.add_argument("--refresh-cache", action="store_true")
+
+    p_update = sub.add_parser("update", help="add boosting rounds using only a new batch of rows")
+    p_update.add_argument("csv")
+    p_update.add_argument("--base", required=True, help="artifact to continue from")
+    p_update.add_argument("--rounds", type=int, default=50)
+    p_update.add_argument("--replay-ratio", type=float, default=0.5)
+    p_update.add_argument("--output", type=Path, default=None)
+    p_update.add_argument("--cache-dir", type=Path, default=None)
+
+    p_synth = sub.add_parser("synthetic", help="write a small synthetic occurrence CSV")
+    p_synth.add_argument("csv")
+    p_synth.add_argument("--rows", type=int, default=2000)
+    p_synth.add_argument("--species", type=int, default=5)
+    p_synth.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args(argv)
+    if args.command == "train":
+        path, artifact = train_full(args.csv, output=args.output, search=args.search,
+                                    n_iter=args.n_iter, n_folds=args.folds, workers=args.workers,
+                                    cache_dir=args.cache_dir, refresh_cache=args.refresh_cache)
+        print(json.dumps({"artifact": str(path), "version": artifact["version"],
+                          "training_seconds": artifact["training_seconds"],
+                          "params": artifact["params"],
+                          "metrics": artifact["metrics"]}, indent=2))
+    elif args.command == "synthetic":
+        path = make_synthetic_occurrences(args.csv, n_rows=args.rows, n_species=args.species, seed=args.seed)
+        print(f"Wrote {args.rows} synthetic rows to {path}")
+    else:
+        _, report = update_incremental(args.base, args.csv, rounds=args.rounds,
+                                       replay_ratio=args.replay_ratio, output=args.output,
+                                       cache_dir=args.cache_dir)
+        print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
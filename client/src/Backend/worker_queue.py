@@ -0,0 +1,28 @@
+# worker_queue.py
+"""
+Shared helper for classes that own a bounded queue drained by one background thread
+(ShadowEvaluator, AuditLogWriter). They keep the queue in `_queue`, the thread in
+`_worker` and count discarded items in `dropped`; QueueWorkerStats turns that into the
+cheap utilization probe registered with process telemetry.
+
+Usage:
+    class MyWorker(QueueWorkerStats): ...
+    telemetry.register_pool("my_worker", worker.utilization)
+"""
+
+import queue
+import threading
+from typing import Dict, Any
+
+
+class QueueWorkerStats:
+    """Mixin: utilization() for a queue + worker-thread pair."""
+
+    _queue: "queue.Queue"
+    _worker: threading.Thread
+    dropped: int
+
+    def utilization(self) -> Dict[str, Any]:
+        """Queue depth/capacity, drops and worker liveness; O(1), safe to call often."""
+        return {"queue_depth": self._queue.qsize(), "queue_capacity": self._queue.maxsize,
+                "dropped": self.dropped, "worker_alive": self._worker.is_alive()}